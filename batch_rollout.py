@@ -0,0 +1,100 @@
+from typing import Dict, Set
+
+import numpy as np
+
+from logic import GameState
+
+# Batched random playouts with NumPy: K playouts from the same position are advanced in
+# lockstep (all of them have the same player to move at each step), with a K x (n+1) matrix
+# of occupied flags and a K x (n+1) matrix of occupied neighbour counts.
+# The graph is a dense neighbour table padded with the dummy node n, which is never occupied.
+
+
+class BatchRolloutBoard:
+    """
+    Dense neighbour table of a graph for batched playouts.
+    """
+    def __init__(self, G: Dict[int, Set[int]]):
+        """
+        :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph.
+        """
+        self.nodes = sorted(G.keys())
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+        self.n = len(self.nodes)
+        max_degree = max((len(G[v]) for v in self.nodes), default=0)
+        # Row n is the dummy node, whose neighbours are all the dummy node
+        self.table = np.full((self.n + 1, max(1, max_degree)), self.n, dtype=np.int64)
+        for i, v in enumerate(self.nodes):
+            row = [self.index[u] for u in G[v]]
+            self.table[i, :len(row)] = row
+
+    def winners(self, state: GameState, player: int, k: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Play k uniformly random games from the given state.
+
+        :param state: (GameState) The starting state.
+        :param player: (int) The player to move first.
+        :param k: (int) Number of playouts.
+        :param rng: (np.random.Generator) The random generator.
+        :return: (np.ndarray) The winner of each playout.
+        """
+        n = self.n
+        table = self.table
+        index = self.index
+
+        occupied = np.zeros((k, n + 1), dtype=bool)
+        occupied[:, [index[v] for v in state.occupied]] = True
+        counts = np.zeros((k, n + 1), dtype=np.int16)
+        for v, c in state.occupied_neighbors.items():
+            counts[:, index[v]] = c
+        ends = np.empty((k, 2), dtype=np.int64)
+        ends[:, 0] = index[state.endpoints[0]]
+        ends[:, 1] = index[state.endpoints[1]]
+
+        winners = np.full(k, -1, dtype=np.int8)
+        rows = np.arange(k)
+        p = player
+        while rows.size:
+            e = ends[rows, p]
+            candidates = table[e]                                   # (a, D)
+            r = rows[:, None]
+            legal = (candidates < n) & ~occupied[r, candidates] & (counts[r, candidates] <= 2)
+            # The endpoint gets a new occupied neighbour: it must have at most one before the move
+            legal &= (counts[rows, e] <= 1)[:, None]
+            # Every other occupied neighbour of the candidate must have at most one as well
+            second = table[candidates]                              # (a, D, D)
+            r2 = rows[:, None, None]
+            bad = occupied[r2, second] & (counts[r2, second] >= 2) & (second != e[:, None, None])
+            legal &= ~bad.any(axis=2)
+
+            stuck = ~legal.any(axis=1)
+            winners[rows[stuck]] = 1 - p
+            moving = ~stuck
+            rows = rows[moving]
+            if not rows.size:
+                break
+            legal = legal[moving]
+            candidates = candidates[moving]
+
+            # Uniform choice among the legal moves: the legal move with the highest random score
+            scores = rng.random(legal.shape)
+            scores[~legal] = -1.0
+            v = candidates[np.arange(rows.size), scores.argmax(axis=1)]
+            occupied[rows, v] = True
+            # Neighbours of v are distinct, except the padding which only touches the dummy column
+            counts[rows[:, None], table[v]] += 1
+            ends[rows, p] = v
+            p = 1 - p
+        return winners
+
+    def wins(self, state: GameState, player: int, k: int, rng: np.random.Generator) -> int:
+        """
+        Play k uniformly random games from the given state and count the wins of player 0.
+
+        :param state: (GameState) The starting state.
+        :param player: (int) The player to move first.
+        :param k: (int) Number of playouts.
+        :param rng: (np.random.Generator) The random generator.
+        :return: (int) Number of playouts won by player 0.
+        """
+        return int(np.count_nonzero(self.winners(state, player, k, rng) == 0))
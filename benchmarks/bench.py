@@ -0,0 +1,417 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bitboard
+from graph import freeze_graph
+from logic import GameState, Move, apply_move, undo_move, get_legal_moves, get_candidate_moves, is_move_legal
+from strategy import STRATEGIES
+from evaluation import RegionEvaluator
+from utils import random_erdos_renyi, hypercube, pick_random_start, freeNeighbor, BFS, utilMove
+
+# Benchmarks of the hot paths: move generation, evaluation functions and searches, on fixed
+# graphs and fixed positions (everything is seeded). Each result is compared with the saved
+# baseline.json:
+#
+#   python benchmarks/bench.py                    # run everything and compare with the baseline
+#   python benchmarks/bench.py --quick            # small graphs only
+#   python benchmarks/bench.py --graphs cube-d8   # some graphs only
+#   python benchmarks/bench.py --update           # save the results as the new baseline
+#
+# Times are in microseconds per call (lower is better), search speeds in nodes or playouts per
+# second (higher is better). The positions are taken along the longest of a few seeded random
+# games, the number of occupied nodes of each position is part of the results.
+#
+# Each graph also times a fixed reference kernel (reference_us), and values are compared with
+# the baseline relative to it (see reference_scale): a machine twice as slow as the one of the
+# baseline doubles both. Differences between machines are not all proportional though (caches,
+# Python builds), and a loaded machine adds noise that --tolerance has to absorb: to compare two
+# versions of the code, regenerate the baseline with --update on the same machine first.
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SEED = 1234
+
+HYPERCUBES = [4, 6, 8, 10, 12]
+ERDOS_RENYI = [30, 100, 500, 1000, 5000]
+QUICK = {"cube-d4", "cube-d6", "cube-d8", "erdos-n30", "erdos-n100"}
+# Positions of the benchmarks, as a fraction of the moves of the longest of a few random games
+LEVELS = {"start": 0.0, "middle": 0.5, "late": 0.9}
+MCTS_ITERATIONS = 300
+
+
+def erdos_p(n: int) -> float:
+    """
+    Edge probability of the Erdos-Renyi graphs: the default 0.08 of main.py for small graphs,
+    then an average degree of about 4.
+    """
+    return min(0.08, 4 / n)
+
+
+def graphs() -> Dict[str, dict]:
+    """
+    :return: (Dict[str, dict]) Builders of the benchmarked graphs, by name.
+    """
+    specs = {}
+    for d in HYPERCUBES:
+        specs[f"cube-d{d}"] = lambda d=d: hypercube(d)
+    for n in ERDOS_RENYI:
+        specs[f"erdos-n{n}"] = lambda n=n: random_erdos_renyi(n, erdos_p(n), seed=SEED)
+    return specs
+
+
+def random_game(G, seed: int, attempts: int = 20) -> Tuple[Tuple[int, int], List[Move]]:
+    """
+    Play random games from seeded start nodes and keep the longest one.
+
+    :return: (Tuple[Tuple[int, int], List[Move]]) The start nodes and the moves of the game.
+    """
+    best = None
+    for attempt in range(attempts):
+        rnd = random.Random(seed * 1000 + attempt)
+        start = pick_random_start(G, seed=seed * 1000 + attempt)
+        state = GameState(G.keys(), G)
+        state.init_snakes(*start)
+        moves = []
+        player = 0
+        while True:
+            legal = get_legal_moves(state, G, player)
+            if not legal:
+                break
+            move = rnd.choice(legal)
+            apply_move(state, player, move)
+            moves.append(move)
+            player = 1 - player
+        if best is None or len(moves) > len(best[1]):
+            best = (start, moves)
+    return best
+
+
+def make_position(G, game: Tuple[Tuple[int, int], List[Move]], fraction: float) -> Tuple[GameState, int]:
+    """
+    Position after the given fraction of the moves of a game (see random_game). The player to
+    move always has a legal move.
+
+    :return: (Tuple[GameState, int]) The position and the player to move.
+    """
+    start, moves = game
+    state = GameState(G.keys(), G)
+    state.init_snakes(*start)
+    # The last move of the game left the opponent without a move
+    count = min(int(fraction * len(moves)), max(0, len(moves) - 1))
+    for i in range(count):
+        apply_move(state, i % 2, moves[i])
+    return state, count % 2
+
+
+def per_call(fn: Callable[[], object], calls: int, repeat: int = 5, min_time: float = 0.05) -> float:
+    """
+    Time a function that makes `calls` calls of the benchmarked code.
+
+    :return: (float) Best time per call over the repetitions, in microseconds.
+    """
+    # Loop enough times for the timer resolution not to matter
+    loops = 1
+    while True:
+        begin = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - begin
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        begin = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - begin)
+    return best / (loops * max(1, calls)) * 1e6
+
+
+def bench_moves(G, state: GameState, player: int) -> Dict[str, float]:
+    """
+    Move generation and evaluation functions on one position, in microseconds per call.
+    """
+    candidates = get_candidate_moves(state, G, player)
+    legal = get_legal_moves(state, G, player)
+
+    def legality():
+        for m in candidates:
+            is_move_legal(state, player, m)
+
+    def apply_undo():
+        for m in legal:
+            apply_move(state, player, m)
+            undo_move(state, player, m)
+
+    def util():
+        for m in legal:
+            utilMove(m, state, G)
+
+    evaluator = RegionEvaluator()
+
+    results = {
+        "get_legal_moves": per_call(lambda: get_legal_moves(state, G, player), 1),
+        "is_move_legal": per_call(legality, len(candidates)),
+        "apply_undo_move": per_call(apply_undo, len(legal)),
+        "freeNeighbor": per_call(lambda: freeNeighbor(G, player, state), 1),
+        "BFS": per_call(lambda: BFS(G, player, state), 1),
+        "regions": per_call(lambda: evaluator(state, player), 1),
+        "utilMove": per_call(util, len(legal)),
+    }
+    results.update(bench_bitboard(G, state, player))
+    return results
+
+
+def bench_bitboard(G, state: GameState, player: int) -> Dict[str, float]:
+    """
+    The same functions with the bitboard backend, on the same position, in microseconds per call.
+    Empty if the nodes of the graph are not 0..n-1.
+    """
+    try:
+        adj = bitboard.adjacency_masks(G)
+    except ValueError:
+        return {}
+    bstate = bitboard.BitboardState.from_state(state, adj)
+    legal = bitboard.get_legal_moves(bstate, adj, player)
+
+    def util():
+        for m in legal:
+            bitboard.util_move(m, bstate)
+
+    return {
+        "bitboard/get_legal_moves": per_call(lambda: bitboard.get_legal_moves(bstate, adj, player), 1),
+        "bitboard/freeNeighbor": per_call(lambda: bitboard.free_neighbor(bstate, player), 1),
+        "bitboard/BFS": per_call(lambda: bitboard.flood_fill(bstate, player), 1),
+        "bitboard/utilMove": per_call(util, len(legal)),
+    }
+
+
+def strategies() -> Dict[str, Callable]:
+    """
+    :return: (Dict[str, Callable]) Factories of the benchmarked search strategies, by name.
+    """
+    # Without the endgame solver, which can answer from the root without searching
+    factories = {"minmax": STRATEGIES["minmax"],
+                 "alphabetafn": lambda: STRATEGIES["alphabetafn"](endgame=0),
+                 "alphabetadfs": lambda: STRATEGIES["alphabetadfs"](endgame=0),
+                 "mcts": lambda: STRATEGIES["mcts"](iterations=MCTS_ITERATIONS, seed=SEED)}
+    # NumPy is optional, only for the batched playouts
+    if importlib.util.find_spec("numpy") is not None:
+        factories["mcts-batch"] = lambda: STRATEGIES["mcts"](iterations=MCTS_ITERATIONS, seed=SEED,
+                                                             batch_rollouts=32)
+    return factories
+
+
+def bench_search(factory: Callable, G, state: GameState, player: int, repeat: int = 3) -> Dict[str, float]:
+    """
+    One move of a search strategy from the given position, best time of a few runs.
+
+    :return: (Dict[str, float]) Nodes per second (playouts per second for MCTS), and the time of
+             the move in milliseconds.
+    """
+    elapsed = None
+    for _ in range(repeat):
+        strategy = factory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            begin = time.perf_counter()
+            strategy.select_move(state.copy(), G, player)
+            t = time.perf_counter() - begin
+        elapsed = t if elapsed is None else min(elapsed, t)
+    if hasattr(strategy, "iterations"):
+        return {"playouts_per_s": strategy.playouts / elapsed, "move_ms": elapsed * 1000}
+    return {"nodes_per_s": strategy.nodes / elapsed, "nodes": strategy.nodes, "move_ms": elapsed * 1000}
+
+
+def reference_kernel() -> float:
+    """
+    Time a fixed piece of Python that does not depend on the code of the project: a breadth-first
+    search of the 8-cube with plain dicts and sets, to scale the results of different machines.
+
+    :return: (float) Time per call in microseconds.
+    """
+    G = {v: [v ^ (1 << i) for i in range(8)] for v in range(256)}
+
+    def bfs():
+        seen = {0}
+        queue = [0]
+        for v in queue:
+            for u in G[v]:
+                if u not in seen:
+                    seen.add(u)
+                    queue.append(u)
+
+    return per_call(bfs, 1)
+
+
+def run_graph(build: Callable) -> Dict[str, dict]:
+    """
+    All the benchmarks on one graph.
+    """
+    G = freeze_graph(build())
+    results = {"nodes": len(G), "reference_us": reference_kernel(), "positions": {}, "search": {}}
+    game = random_game(G, SEED)
+    for level, fraction in LEVELS.items():
+        state, player = make_position(G, game, fraction)
+        entry = bench_moves(G, state, player)
+        entry["occupied"] = len(state.occupied)
+        results["positions"][level] = entry
+
+    # Searches start from a position a few moves into the game, where the branching factor is
+    # still large and the searches are not trivially short
+    state, player = make_position(G, game, 0.2)
+    for name, factory in strategies().items():
+        results["search"][name] = bench_search(factory, G, state, player)
+    return results
+
+
+def flatten(results: Dict[str, dict]) -> Dict[str, float]:
+    """
+    :return: (Dict[str, float]) The timed values, by 'graph/position/function' or
+             'graph/search/strategy/unit'.
+    """
+    flat = {}
+    for graph, r in results.items():
+        for level, entry in r["positions"].items():
+            for fn, value in entry.items():
+                if fn != "occupied":
+                    flat[f"{graph}/{level}/{fn}"] = value
+        for s, entry in r["search"].items():
+            for unit in ("nodes_per_s", "playouts_per_s"):
+                if unit in entry:
+                    flat[f"{graph}/search/{s}/{unit}"] = entry[unit]
+    return flat
+
+
+def reference_scale(current: Dict[str, dict], baseline: Dict[str, dict]) -> float:
+    """
+    How much slower the current run is than the baseline run, from the reference kernel times of
+    the graphs of both. The fastest time of each run is used, the others being slowed down by
+    the load of the machine.
+
+    :return: (float) The ratio, 1 if the baseline has no reference times.
+    """
+    graphs = [g for g in current if "reference_us" in baseline.get(g, {})]
+    if not graphs:
+        return 1.0
+    return min(current[g]["reference_us"] for g in graphs) / min(baseline[g]["reference_us"] for g in graphs)
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    :return: (List[str]) The values that are worse than the baseline by more than the tolerance,
+             once scaled by the reference kernel times of both runs (see reference_kernel).
+    """
+    regressions = []
+    scale = reference_scale(current, baseline)
+    old = flatten(baseline)
+    for key, value in flatten(current).items():
+        if key not in old:
+            continue
+        # Speeds (per second) are better when higher, times when lower
+        if value <= 0 or old[key] <= 0:
+            continue
+        ratio = old[key] / (value * scale) if key.endswith("_per_s") else value / (old[key] * scale)
+        if ratio > tolerance:
+            regressions.append(f"{key}: {value:.2f} vs {old[key]:.2f} ({ratio:.2f}x slower)")
+    return regressions
+
+
+def report(results: Dict[str, dict]):
+    functions = ["get_legal_moves", "is_move_legal", "apply_undo_move", "freeNeighbor", "BFS", "regions", "utilMove"]
+    print(f"{'graph':<12} {'position':<8} {'occ':>5} " + " ".join(f"{f:>15}" for f in functions) + "   (us/call)")
+    for graph, r in results.items():
+        for level, entry in r["positions"].items():
+            print(f"{graph:<12} {level:<8} {entry['occupied']:5d} "
+                  + " ".join(f"{entry.get(f, float('nan')):15.2f}" for f in functions))
+    print()
+    # Speed-up of the bitboard backend over the functions of logic.py and utils.py
+    functions = ["get_legal_moves", "freeNeighbor", "BFS", "utilMove"]
+    print(f"{'graph':<12} {'position':<8} " + " ".join(f"{f:>15}" for f in functions) + "   (bitboard speed-up)")
+    for graph, r in results.items():
+        for level, entry in r["positions"].items():
+            if f"bitboard/{functions[0]}" in entry:
+                print(f"{graph:<12} {level:<8} "
+                      + " ".join(f"{entry[f] / entry[f'bitboard/{f}']:14.2f}x" for f in functions))
+    print()
+    for graph, r in results.items():
+        speeds = []
+        for s, entry in r["search"].items():
+            if "nodes_per_s" in entry:
+                speeds.append(f"{s} {entry['nodes_per_s']:.0f} nodes/s")
+            else:
+                speeds.append(f"{s} {entry['playouts_per_s']:.0f} playouts/s")
+        print(f"{graph:<12} " + ", ".join(speeds))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks of move generation, evaluation and search")
+    ap.add_argument("--graphs", type=str, nargs="+", default=None, help="Graphs to run, e.g. cube-d8 erdos-n100")
+    ap.add_argument("--quick", action="store_true", help="Small graphs only")
+    ap.add_argument("--out", type=str, default=None, help="Write the results as JSON to this file")
+    ap.add_argument("--update", action="store_true", help="Save the results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=1.5,
+                    help="Allowed ratio between a measured value and its baseline")
+    args = ap.parse_args()
+
+    specs = graphs()
+    names = args.graphs or list(specs)
+    if args.quick:
+        names = [n for n in names if n in QUICK]
+    unknown = [n for n in names if n not in specs]
+    if unknown:
+        ap.error(f"Unknown graphs: {', '.join(unknown)} (choose from {', '.join(specs)})")
+
+    results = {}
+    for name in names:
+        begin = time.perf_counter()
+        results[name] = run_graph(specs[name])
+        print(f"{name} done in {time.perf_counter() - begin:.1f}s (reference kernel "
+              f"{results[name]['reference_us']:.1f} us)", file=sys.stderr)
+
+    report(results)
+    output = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+    if args.update:
+        saved = {"results": {}}
+        if os.path.exists(BASELINE):
+            with open(BASELINE, encoding="utf-8") as f:
+                saved = json.load(f)
+        saved["python"] = output["python"]
+        saved["machine"] = output["machine"]
+        saved["results"].update(results)
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {BASELINE}")
+        return 0
+
+    if not os.path.exists(BASELINE):
+        print("No baseline, run with --update to save one")
+        return 0
+    with open(BASELINE, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.tolerance)
+    print()
+    for r in regressions:
+        print("SLOWER", r)
+    if not regressions:
+        print("OK: no regression against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Startup time of the headless path (python main.py without --ui).
+#
+# Runs `python -X importtime -c "import main"` several times and keeps the best cumulative
+# import time of each module of the project, checks that the UI stack (matplotlib, networkx)
+# is not loaded, and times a complete headless game. Results are compared with the numbers
+# saved in import_time.json:
+#
+#   python benchmarks/import_time.py            # compare with the saved numbers
+#   python benchmarks/import_time.py --update   # save the current numbers as the new baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time.json")
+
+# Modules of the project whose import time is tracked
+MODULES = ["main", "strategy", "game", "logic", "utils", "graph", "bitboard", "transposition", "parallel", "rollout",
+           "symmetry", "endgame", "evaluation", "mcts_tree", "instrumentation"]
+# Modules that must not be loaded by a headless run
+FORBIDDEN = ["matplotlib", "networkx", "numpy", "ui"]
+HEADLESS_GAME = [sys.executable, "main.py", "--graph", "cube", "--d", "3", "--s0", "random", "--s1", "random"]
+
+
+def import_times(repeats: int) -> dict:
+    """
+    Best cumulative import time of each tracked module, in milliseconds.
+    """
+    # Compile the project first: with stale or missing bytecode (PYTHONDONTWRITEBYTECODE) the
+    # measures would include the compilation of the modules
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    best = {}
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = line[len("import time:"):].split("|")
+            if not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            if name in MODULES:
+                ms = int(parts[1]) / 1000
+                best[name] = min(best.get(name, ms), ms)
+    return best
+
+
+def loaded_forbidden() -> list:
+    """
+    Forbidden modules loaded by `import main`.
+    """
+    code = "import sys, main; print(' '.join(m for m in %r if m in sys.modules))" % (FORBIDDEN,)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def headless_game_time(repeats: int) -> float:
+    """
+    Best wall-clock time of a complete small headless game (interpreter startup included), in ms.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(HEADLESS_GAME, cwd=ROOT, capture_output=True, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Startup time benchmark of the headless path")
+    ap.add_argument("--repeats", type=int, default=7, help="Number of runs, the best one is kept")
+    ap.add_argument("--update", action="store_true", help="Save the results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=1.5,
+                    help="Allowed ratio between a measured time and its baseline")
+    ap.add_argument("--slack", type=float, default=5.0,
+                    help="Allowed increase over the baseline in ms, whatever the ratio")
+    args = ap.parse_args()
+
+    measured = {"import_ms": import_times(args.repeats), "headless_game_ms": headless_game_time(args.repeats)}
+    forbidden = loaded_forbidden()
+
+    for name, ms in sorted(measured["import_ms"].items(), key=lambda x: -x[1]):
+        print(f"import {name:<14} {ms:8.2f} ms")
+    print(f"headless game       {measured['headless_game_ms']:8.2f} ms")
+
+    if args.update:
+        budget = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE, encoding="utf-8") as f:
+                budget = json.load(f).get("budget", {})
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump({"budget": budget, "baseline": measured}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {BASELINE}")
+        return 0
+
+    with open(BASELINE, encoding="utf-8") as f:
+        saved = json.load(f)
+    failures = []
+    if forbidden:
+        failures.append(f"headless import loads {', '.join(forbidden)}")
+    for key, limit in saved["budget"].items():
+        value = measured["headless_game_ms"] if key == "headless_game_ms" else measured["import_ms"].get(key, 0.0)
+        if value > limit:
+            failures.append(f"{key}: {value:.2f} ms over the budget of {limit:.2f} ms")
+    for name, ms in saved["baseline"]["import_ms"].items():
+        value = measured["import_ms"].get(name, 0.0)
+        # Modules that take a few milliseconds are too noisy for a ratio alone: they get an
+        # absolute budget instead
+        if value > max(ms * args.tolerance, ms + args.slack):
+            failures.append(f"import {name}: {value:.2f} ms, baseline {ms:.2f} ms")
+
+    for failure in failures:
+        print("FAIL", failure)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
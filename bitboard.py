@@ -0,0 +1,292 @@
+from typing import Dict, Set, List, Optional
+
+from logic import GameState, Move
+
+# Bitboard backend for the game state.
+# Nodes must be the integers 0..n-1. The occupied nodes and the neighbourhood of each node
+# are stored as Python ints used as bitmasks (bit v set <=> node v belongs to the set),
+# so that e.g. the free neighbours of v are simply adj[v] & ~occ.
+
+
+def adjacency_masks(G: Dict[int, Set[int]]) -> List[int]:
+    """
+    Convert an adjacency dictionary to a list of neighbourhood bitmasks.
+
+    :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph, with nodes 0..n-1.
+    :return: (List[int]) adj[v] is the bitmask of the neighbours of v.
+    """
+    n = len(G)
+    adj = [0] * n
+    for v in range(n):
+        if v not in G:
+            raise ValueError('Bitboard graphs require nodes 0..n-1')
+        mask = 0
+        for u in G[v]:
+            mask |= 1 << u
+        adj[v] = mask
+    return adj
+
+
+def hypercube_masks(d: int) -> List[int]:
+    """
+    Create the neighbourhood bitmasks of a hypercube with d dimensions directly,
+    without going through utils.hypercube.
+
+    :param d: (int) Number of dimensions.
+    :return: (List[int]) adj[v] is the bitmask of the neighbours of v.
+    """
+    n = 1 << d
+    adj = [0] * n
+    for x in range(n):
+        mask = 0
+        for i in range(d):
+            mask |= 1 << (x ^ (1 << i))
+        adj[x] = mask
+    return adj
+
+
+def iter_bits(mask: int):
+    """
+    Iterate over the nodes of a bitmask, in increasing order.
+
+    :param mask: (int) A bitmask of nodes.
+    :return: (Iterator[int]) The nodes whose bit is set.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitboardState:
+    """
+    Game state where the occupied nodes are a bitmask and the graph a list of neighbourhood bitmasks.
+    It exposes the same snakes/endpoints attributes as logic.GameState.
+    """
+    def __init__(self, adj: List[int]):
+        """
+        Initialize the game state.
+
+        :param adj: (List[int]) Neighbourhood bitmasks of the graph, see adjacency_masks().
+        """
+        self.adj = adj
+        self.G = adj
+        self.nodes = range(len(adj))
+        self.snakes: Dict[int, List[int]] = {0: [], 1: []}
+        self.endpoints: Dict[int, Optional[int]] = {0: None, 1: None}
+        # Occupied nodes bitmask
+        self.occ = 0
+
+    @classmethod
+    def from_state(cls, state: GameState, adj: List[int] = None) -> 'BitboardState':
+        """
+        Build a bitboard state from a logic.GameState.
+
+        :param state: (GameState) The state to convert.
+        :param adj: (List[int]) Optional precomputed neighbourhood bitmasks of state.G.
+        :return: (BitboardState) The equivalent bitboard state.
+        """
+        new = cls(adj if adj is not None else adjacency_masks(state.G))
+        new.snakes = {0: list(state.snakes[0]), 1: list(state.snakes[1])}
+        new.endpoints = dict(state.endpoints)
+        for v in state.occupied:
+            new.occ |= 1 << v
+        return new
+
+    @property
+    def occupied(self) -> Set[int]:
+        """
+        The occupied nodes as a set, for compatibility with code written for logic.GameState.
+        """
+        return set(iter_bits(self.occ))
+
+    def init_snakes(self, start_a: int, start_b: int):
+        """
+        Initialize the snakes with their starting positions.
+
+        :param start_a: (int) Starting position for player A.
+        :param start_b: (int) Starting position for player B.
+        :return: (None)
+        """
+        if start_a == start_b:
+            raise ValueError('Start nodes must be distinct')
+        self.snakes[0] = [start_a]
+        self.snakes[1] = [start_b]
+        self.endpoints[0] = start_a
+        self.endpoints[1] = start_b
+        self.occ = (1 << start_a) | (1 << start_b)
+
+    def copy(self):
+        """
+        Create a copy of the current game state. The adjacency masks are shared.
+
+        :return: (BitboardState) A copy of the current game state.
+        """
+        new = BitboardState(self.adj)
+        new.snakes = {0: list(self.snakes[0]), 1: list(self.snakes[1])}
+        new.endpoints = dict(self.endpoints)
+        new.occ = self.occ
+        return new
+
+
+def _can_enter(adj: List[int], occ: int, v: int) -> bool:
+    """
+    Check the induced path property for occupying the free node v: v must have at most two
+    occupied neighbours, and each of them must have at most one before the move.
+    """
+    around = adj[v] & occ
+    if around.bit_count() > 2:
+        return False
+    for u in iter_bits(around):
+        if (adj[u] & occ).bit_count() >= 2:
+            return False
+    return True
+
+
+def is_move_legal(state: BitboardState, player: int, move: Move) -> bool:
+    """
+    Check if a move is legal according to the game rules.
+    Same answers as logic.is_move_legal.
+
+    :param state: (BitboardState) The current game state.
+    :param player: (int) The ID of the current player, 0 or 1.
+    :param move: (Move) The move to check.
+    :return: (bool) True if the move is legal, False otherwise.
+    """
+    if state.endpoints[player] != move.from_node:
+        return False
+    bit = 1 << move.to_node
+    if state.occ & bit:
+        return False
+    if not state.adj[move.from_node] & bit:
+        return False
+    return _can_enter(state.adj, state.occ, move.to_node)
+
+
+def apply_move(state: BitboardState, player: int, move: Move) -> None:
+    """
+    Apply a move to the game state. The move is assumed to be legal.
+
+    :param state: (BitboardState) The current game state.
+    :param player: (int) The ID of the current player, 0 or 1.
+    :param move: (Move) The move to apply.
+    :return: (None)
+    """
+    state.snakes[player].append(move.to_node)
+    state.endpoints[player] = move.to_node
+    state.occ |= 1 << move.to_node
+
+
+def undo_move(state: BitboardState, player: int, move: Move) -> None:
+    """
+    Undo a move previously applied with apply_move, see logic.undo_move.
+
+    :param state: (BitboardState) The current game state.
+    :param player: (int) The ID of the player who played the move, 0 or 1.
+    :param move: (Move) The move to undo, which must be the last move of this player.
+    :return: (None)
+    """
+    state.snakes[player].pop()
+    state.endpoints[player] = move.from_node
+    state.occ &= ~(1 << move.to_node)
+
+
+def get_candidate_moves(state: BitboardState, G: List[int], player: int) -> List[Move]:
+    """
+    Generate all candidate moves (free neighbours of the endpoint) for the given player.
+
+    :param state: (BitboardState) The current game state.
+    :param G: (List[int]) Neighbourhood bitmasks of the graph.
+    :param player: (int) ID of the current player, 0 or 1.
+    :return: (List[Move]) A list of candidate moves, regardless of whether they are legal or not.
+    """
+    endpoint = state.endpoints[player]
+    if endpoint is None:
+        return []
+    return [Move(from_node=endpoint, to_node=v) for v in iter_bits(G[endpoint] & ~state.occ)]
+
+
+def get_legal_moves(state: BitboardState, G: List[int], player: int) -> List[Move]:
+    """
+    Determines and returns a list of legal moves for the specified player.
+
+    :param state: (BitboardState) The current game state.
+    :param G: (List[int]) Neighbourhood bitmasks of the graph.
+    :param player: (int) ID of the current player, 0 or 1.
+    :return: (List[Move]) A list of legal moves, in increasing order of destination node.
+    """
+    endpoint = state.endpoints[player]
+    if endpoint is None:
+        return []
+    occ = state.occ
+    return [Move(from_node=endpoint, to_node=v) for v in iter_bits(G[endpoint] & ~occ) if _can_enter(G, occ, v)]
+
+
+# Evaluation helpers, bitboard versions of the ones in utils.py
+
+def free_neighbor(state: BitboardState, player: int) -> int:
+    """
+    Bitboard version of utils.freeNeighbor: difference between the number of free neighbours
+    of each endpoint that have no other occupied neighbour.
+
+    :param state: (BitboardState) The current game state.
+    :param player: (int) The player from whose point of view the score is computed.
+    :return: (int) The score.
+    """
+    adj = state.adj
+    occ = state.occ
+    counts = []
+    for p in (0, 1):
+        end = state.endpoints[p]
+        others = occ & ~(1 << end)
+        count = 0
+        for v in iter_bits(adj[end] & ~occ):
+            if not adj[v] & others:
+                count += 1
+        counts.append(count)
+    if player == 0:
+        return counts[0] - counts[1]
+    elif player == 1:
+        return counts[1] - counts[0]
+    return None
+
+
+def flood_fill(state: BitboardState, player: int) -> int:
+    """
+    Bitboard version of utils.BFS: both players alternately expand one node of their
+    breadth-first search, each free node is counted for the first player reaching it.
+    Neighbours are enqueued in increasing order, whereas utils.BFS follows the iteration order
+    of the adjacency sets, so the two can differ when both players reach a node in the same round.
+
+    :param state: (BitboardState) The current game state.
+    :param player: (int) Unused, like in utils.BFS the score is always count0 - count1.
+    :return: (int) The score.
+    """
+    adj = state.adj
+    explored = state.occ
+    queues = ([state.endpoints[0]], [state.endpoints[1]])
+    heads = [0, 0]
+    counts = [0, 0]
+    while heads[0] < len(queues[0]) or heads[1] < len(queues[1]):
+        for p in (0, 1):
+            queue = queues[p]
+            if heads[p] < len(queue):
+                v = queue[heads[p]]
+                heads[p] += 1
+                new = adj[v] & ~explored
+                if new:
+                    explored |= new
+                    counts[p] += new.bit_count()
+                    queue.extend(iter_bits(new))
+    return counts[0] - counts[1]
+
+
+def util_move(move: Move, state: BitboardState) -> int:
+    """
+    Bitboard version of utils.utilMove: number of free neighbours of the destination of a move.
+
+    :param move: (Move) The move.
+    :param state: (BitboardState) The current game state.
+    :return: (int) Number of free neighbours.
+    """
+    return (state.adj[move.to_node] & ~state.occ).bit_count()
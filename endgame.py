@@ -0,0 +1,215 @@
+from typing import Dict, List, Optional, Tuple
+
+from logic import GameState, Move
+
+# Exact endgame solver.
+# Only the free nodes that can still be entered matter: a free node next to an occupied node
+# that already has two occupied neighbours (the inside of a snake), or with three occupied
+# neighbours, can never be entered, since occupied neighbour counts only grow. When the free
+# nodes that can be entered and reached from the endpoints are few, the game is solved exactly
+# by a negamax on a small local copy of the position: the region, the occupied nodes around it
+# (the boundary, endpoints included) and their occupied neighbours outside of it, as bitmasks.
+
+
+class SolverBudgetExceeded(Exception):
+    """
+    Raised inside the solver when a position takes more nodes than allowed.
+    """
+
+
+class EndgameSolver:
+    """
+    Perfect play solver for positions whose reachable free region is small. Results are cached
+    by Zobrist key (GameState.key) across calls, and inside a call by local position.
+    """
+    def __init__(self, max_region: int = 14, max_nodes: int = 20000, cache_size: int = 1 << 18):
+        """
+        :param max_region: (int) Largest region (free nodes that can be entered and reached from
+                           the endpoints) solved.
+        :param max_nodes: (int) Largest number of positions visited by one call, None is returned
+                          above it.
+        :param cache_size: (int) Number of results kept across calls, the cache is emptied when full.
+        """
+        self.max_region = max_region
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+        self.cache: Dict[int, Optional[bool]] = {}
+        # Statistics
+        self.calls = 0
+        self.solved = 0
+        self.nodes = 0
+
+    def clear(self):
+        """
+        Forget the cached results, whose keys only depend on the node numbers (see GameState.key):
+        to be called when the graph changes.
+        """
+        self.cache.clear()
+
+    def region(self, state: GameState, limit: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Free nodes that can still be entered and are reachable from the endpoints through such nodes.
+        The region can only shrink as the game goes on.
+
+        :param state: (GameState) The game state.
+        :param limit: (Optional[int]) Largest region returned, max_region if None.
+        :return: (Optional[List[int]]) The region, or None if it has more than limit nodes.
+        """
+        if limit is None:
+            limit = self.max_region
+        G = state.G
+        occupied = state.occupied
+        counts = state.occupied_neighbors
+        seen = set()
+        stack = [state.endpoints[0], state.endpoints[1]]
+        region = []
+        while stack:
+            v = stack.pop()
+            for w in G[v]:
+                if w in occupied or w in seen:
+                    continue
+                seen.add(w)
+                c = counts.get(w, 0)
+                # Nodes without occupied neighbours (most of them early in the game) can be entered
+                if c and (c > 2 or any(u in occupied and counts.get(u, 0) >= 2 for u in G[w])):
+                    continue
+                region.append(w)
+                if len(region) > limit:
+                    return None
+                stack.append(w)
+        return region
+
+    def solve(self, state: GameState, player: int) -> Optional[bool]:
+        """
+        :param state: (GameState) The game state, not modified.
+        :param player: (int) The player to move.
+        :return: (Optional[bool]) True if the player to move wins with perfect play, False if they
+                 lose, None if the position is too large to be solved.
+        """
+        key = state.key(player)
+        if key in self.cache:
+            return self.cache[key]
+        self.calls += 1
+        region = self.region(state)
+        result = None
+        if region is not None:
+            local = _LocalPosition(state, region, self.max_nodes)
+            try:
+                result = local.wins(local.occ, local.ends[0], local.ends[1], player)
+                self.solved += 1
+            except SolverBudgetExceeded:
+                result = None
+            self.nodes += local.nodes
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = result
+        return result
+
+    def best_move(self, state: GameState, player: int) -> Tuple[Optional[bool], Optional[Move]]:
+        """
+        Solve the position and find a winning move.
+
+        :param state: (GameState) The game state, not modified.
+        :param player: (int) The player to move.
+        :return: (Tuple[Optional[bool], Optional[Move]]) The result as in solve(), and a winning move
+                 if the result is True.
+        """
+        self.calls += 1
+        region = self.region(state)
+        if region is None:
+            return None, None
+        local = _LocalPosition(state, region, self.max_nodes)
+        try:
+            for v in local.moves(local.occ, local.ends[player]):
+                ends = list(local.ends)
+                ends[player] = v
+                if not local.wins(local.occ | 1 << v, ends[0], ends[1], 1 - player):
+                    return True, Move(state.endpoints[player], local.nodes_list[v])
+            return False, None
+        except SolverBudgetExceeded:
+            return None, None
+        finally:
+            self.nodes += local.nodes
+
+
+class _LocalPosition:
+    """
+    The region, its boundary and the endpoints, numbered 0..k-1, with bitmask neighbourhoods.
+    """
+    def __init__(self, state: GameState, region: List[int], max_nodes: int):
+        G = state.G
+        occupied = state.occupied
+        nodes = list(region)
+        in_region = set(region)
+        boundary = {u for v in region for u in G[v] if u in occupied}
+        boundary.update(state.endpoints.values())
+        nodes.extend(sorted(boundary))
+        index = {v: i for i, v in enumerate(nodes)}
+        self.nodes_list = nodes
+        self.adj = [sum(1 << index[u] for u in G[v] if u in index) for v in nodes]
+        # Occupied neighbours outside of the local nodes: they never change during the solve
+        self.ext = [sum(1 for u in G[v] if u in occupied and u not in index) for v in nodes]
+        self.free = sum(1 << index[v] for v in in_region)
+        self.occ = sum(1 << index[v] for v in boundary)
+        self.ends = (index[state.endpoints[0]], index[state.endpoints[1]])
+        self.bits = len(nodes).bit_length()
+        self.memo: Dict[int, bool] = {}
+        self.nodes = 0
+        self.max_nodes = max_nodes
+
+    def moves(self, occ: int, e: int) -> List[int]:
+        """
+        Local nodes the endpoint e can move to, with the rules of logic.is_move_legal.
+        """
+        adj = self.adj
+        ext = self.ext
+        # The endpoint gets a new occupied neighbour: it must have at most one
+        if ext[e] + (adj[e] & occ).bit_count() > 1:
+            return []
+        result = []
+        candidates = adj[e] & self.free & ~occ
+        while candidates:
+            low = candidates & -candidates
+            v = low.bit_length() - 1
+            candidates ^= low
+            around = adj[v] & occ
+            if ext[v] + around.bit_count() > 2:
+                continue
+            around &= ~(1 << e)
+            ok = True
+            while around:
+                b = around & -around
+                u = b.bit_length() - 1
+                around ^= b
+                if ext[u] + (adj[u] & occ).bit_count() >= 2:
+                    ok = False
+                    break
+            if ok:
+                result.append(v)
+        return result
+
+    def wins(self, occ: int, e0: int, e1: int, player: int) -> bool:
+        """
+        Negamax: True if the player to move wins.
+        """
+        bits = self.bits
+        key = ((occ << bits | e0) << bits | e1) << 1 | player
+        memo = self.memo
+        if key in memo:
+            return memo[key]
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SolverBudgetExceeded()
+        result = False
+        if player == 0:
+            for v in self.moves(occ, e0):
+                if not self.wins(occ | 1 << v, v, e1, 1):
+                    result = True
+                    break
+        else:
+            for v in self.moves(occ, e1):
+                if not self.wins(occ | 1 << v, e0, v, 0):
+                    result = True
+                    break
+        memo[key] = result
+        return result
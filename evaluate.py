@@ -1,6 +1,7 @@
-import os
 import time
 
+from tournament import GraphSpec, run_tournament, summarize
+
 '''
 autoclomplétion avec copilot
 '''
@@ -11,39 +12,31 @@ s1 = input("Choisir stratégie pour S1 :") or "greedy"
 
 dimension = input("Choisir la dimension du cube (3 par défaut) :") or "3"
 nombreParties = input("Choisir le nombre de parties a jouer (10 par défaut) :") or "10"
+graine = input("Choisir la graine de la première partie (0 par défaut) :") or "0"
+print("Graine :", graine)
 
 
-# Réinitialiser le fichier de sortie
-open("output.txt", "w", encoding="utf-8").close()
-bashCommand = (
-    f"python main.py --graph cube --d {dimension} --s0 {s0} --s1 {s1} --verbose "
-    f"| tee >(grep '^Winner:' >> output.txt)"
-)
-
-for i in range(1, int(nombreParties) + 1):
-
-    start_time = time.time()
-    os.system(f'bash -lc "{bashCommand}"')
-    end_time= time.time()
-    duree = end_time - start_time
-    print("Temps écoulé ",duree)
+# Toutes les parties sont jouées dans ce processus (voir tournament.py), par paires sur les mêmes
+# sommets de départ, S0 et S1 jouant chacun une fois en premier
+start_time = time.time()
+records = run_tournament(s0, s1, int(nombreParties), GraphSpec(kind="cube", d=int(dimension)), seed=int(graine))
+end_time = time.time()
+duree = end_time - start_time
+print("Temps écoulé ", duree)
 
-compteurWinner0 = 0
-compteurWinner1 = 0
-with open("output.txt", "r", encoding="utf-8") as f:
-    lignes = f.readlines()
-    for ligne in lignes:
-        ligne = ligne.strip()
-        if ligne == "Winner: 0":
-            compteurWinner0 += 1
-        elif ligne == "Winner: 1":
-            compteurWinner1 += 1
+# S0 est le joueur 0 des parties paires et le joueur 1 des parties impaires
+compteurWinner0 = sum(1 for i, r in enumerate(records) if r.winner == i % 2)
+compteurWinner1 = len(records) - compteurWinner0
+compteurPremier = sum(1 for r in records if r.winner == 0)
 
 
 print("\n")            
 print("Résultats de l'évaluation :")
 print(f" Le joueur s0 avec la stratégie {s0} a gagné {compteurWinner0} parties, winrate : {compteurWinner0/int(nombreParties)*100} %")
 print(f" Le joueur s1 avec la stratégie {s1} a gagné {compteurWinner1} parties, winrate : {compteurWinner1/int(nombreParties)*100} %")
+print(f" Le premier joueur a gagné {compteurPremier} parties, winrate : {compteurPremier/int(nombreParties)*100} %")
+for name, s in summarize(records).items():
+    print(f" Temps moyen par coup de {name} : {s['avg_move_time'] * 1000:.2f} ms")
 
 
 print("Test terminée")
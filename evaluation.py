@@ -0,0 +1,271 @@
+from typing import Set, Tuple
+
+from logic import GameState, Move, apply_move, undo_move
+
+# Leaf evaluation by territories and chambers.
+#
+# Only the free nodes that can still be entered are considered: a free node with three occupied
+# neighbours, or next to an occupied node that already has two (the inside of a snake), can never
+# be entered (see endgame.py). The other free nodes are split between the players by a
+# simultaneous breadth-first search from both endpoints (a Voronoi partition): a node belongs to
+# the player who reaches it first, nodes reached by both at the same distance belong to nobody.
+#
+# In its territory a snake cannot visit every node: at an articulation point it has to choose one
+# of the parts the point separates, and never comes back. The length of the longest path is
+# estimated on the tree of these parts (chambers): the nodes of a chamber are all counted, plus
+# the best of the chambers hanging below it.
+#
+# Sibling leaves (the positions after each move of the same parent position) share the set of
+# free nodes that cannot be entered: it is computed once per parent, and each leaf only adds the
+# few nodes its last move closes.
+
+
+def dead_nodes(state: GameState) -> Set[int]:
+    """
+    Free nodes that can never be entered.
+
+    :param state: (GameState) The game state.
+    :return: (Set[int]) The nodes.
+    """
+    G = state.G
+    occupied = state.occupied
+    counts = state.occupied_neighbors
+    dead = set()
+    for u in occupied:
+        interior = counts.get(u, 0) >= 2
+        for x in G[u]:
+            if x not in occupied and (interior or counts[x] > 2):
+                dead.add(x)
+    return dead
+
+
+def closed_by_move(state: GameState, move: Move) -> Set[int]:
+    """
+    Free nodes that can no longer be entered because of the last move, which was just applied.
+    Only the occupied neighbour counts of the neighbours of move.to_node changed.
+
+    :param state: (GameState) The game state after the move.
+    :param move: (Move) The move.
+    :return: (Set[int]) The nodes, added to the dead nodes of the position before the move.
+    """
+    G = state.G
+    occupied = state.occupied
+    counts = state.occupied_neighbors
+    w = move.to_node
+    closed = set()
+    for u in G[w]:
+        if u in occupied:
+            if counts[u] >= 2:
+                closed.update(x for x in G[u] if x not in occupied)
+        elif counts[u] > 2:
+            closed.add(u)
+    if counts.get(w, 0) >= 2:
+        closed.update(x for x in G[w] if x not in occupied)
+    return closed
+
+
+class RegionEvaluator:
+    """
+    Evaluation of a position by the estimated length of the longest path of each player in their
+    territory, see above. One instance per search: it keeps per-node work arrays (no allocation
+    per leaf) and the dead nodes of the last parent position.
+    """
+    def __init__(self, path_limit: int = 64):
+        """
+        :param path_limit: (int) Largest territory whose longest path is estimated, the size of
+                           larger territories is used instead (the estimate costs about as much
+                           as the territories).
+        """
+        self.path_limit = path_limit
+        self.G = None
+        self.stamp = 0
+        # Dead nodes of the position before the last move of the last leaf, by Zobrist hash
+        self.parent_hash = None
+        self.parent_dead: Set[int] = set()
+        # Statistics
+        self.calls = 0
+        self.reused = 0
+
+    def set_graph(self, G):
+        """
+        Allocate the work arrays for a graph (once per graph).
+        """
+        if G is self.G:
+            return
+        self.G = G
+        size = max(G) + 1 if len(G) else 0
+        # Nodes whose seen entry is the current stamp were reached by the current evaluation
+        self.seen = [0] * size
+        self.owner = [0] * size
+        self.dist = [0] * size
+        self.visited = [0] * size
+        self.disc = [0] * size
+        self.low = [0] * size
+        self.size = [0] * size
+        self.bonus = [0] * size
+        self.parent_hash = None
+
+    def dead(self, state: GameState) -> Tuple[Set[int], Set[int]]:
+        """
+        Dead nodes of a position, as the dead nodes before the last move (cached for the siblings)
+        and the nodes closed by the last move.
+
+        :param state: (GameState) The game state, restored when the function returns.
+        :return: (Tuple[Set[int], Set[int]]) Both sets.
+        """
+        snakes = state.snakes
+        # Player 0 plays first: they played last if their snake is longer
+        mover = 0 if len(snakes[0]) > len(snakes[1]) else 1
+        snake = snakes[mover]
+        if len(snake) < 2:
+            return dead_nodes(state), set()
+        move = Move(snake[-2], snake[-1])
+        keys = state.zobrist_endpoint[mover]
+        parent_hash = (state.hash ^ state.zobrist_occupied[move.to_node]
+                       ^ keys[move.from_node] ^ keys[move.to_node])
+        if parent_hash == self.parent_hash:
+            self.reused += 1
+        else:
+            undo_move(state, mover, move)
+            try:
+                self.parent_dead = dead_nodes(state)
+            finally:
+                apply_move(state, mover, move)
+            self.parent_hash = parent_hash
+        return self.parent_dead, closed_by_move(state, move)
+
+    def territories(self, state: GameState) -> Tuple[int, int]:
+        """
+        Simultaneous breadth-first search from both endpoints over the free nodes that can be
+        entered. Marks the nodes of each territory (owner 0 or 1, 2 for the contested ones) with
+        the current stamp.
+
+        :return: (Tuple[int, int]) Number of nodes of the territory of each player.
+        """
+        G = state.G
+        dead, closed = self.dead(state)
+        stamp = self.stamp
+        seen = self.seen
+        owner = self.owner
+        dist = self.dist
+        # Nodes that cannot be entered are marked as seen (owner 3) beforehand, so that the
+        # search only checks the work arrays
+        for blocked in (state.occupied, dead, closed):
+            for x in blocked:
+                seen[x] = stamp
+                owner[x] = 3
+        frontier0 = [state.endpoints[0]]
+        frontier1 = [state.endpoints[1]]
+        size0 = size1 = 0
+        level = 0
+        while frontier0 or frontier1:
+            level += 1
+            next0 = []
+            for v in frontier0:
+                for x in G[v]:
+                    if seen[x] != stamp:
+                        seen[x] = stamp
+                        owner[x] = 0
+                        dist[x] = level
+                        next0.append(x)
+            next1 = []
+            contested = False
+            for v in frontier1:
+                for x in G[v]:
+                    if seen[x] != stamp:
+                        seen[x] = stamp
+                        owner[x] = 1
+                        next1.append(x)
+                    elif owner[x] == 0 and dist[x] == level:
+                        # Reached by both players at the same distance
+                        owner[x] = 2
+                        contested = True
+            # Contested nodes are not expanded
+            if contested:
+                next0 = [x for x in next0 if owner[x] == 0]
+            frontier0 = next0
+            frontier1 = next1
+            size0 += len(next0)
+            size1 += len(next1)
+        return size0, size1
+
+    def longest_path(self, root: int, p: int) -> int:
+        """
+        Estimated number of moves the snake of player p can still make in its territory, from its
+        endpoint root, by an iterative depth-first search computing articulation points (Tarjan's
+        low links). Must be called after territories().
+
+        :return: (int) The estimate.
+        """
+        G = self.G
+        stamp = self.stamp
+        seen = self.seen
+        owner = self.owner
+        visited = self.visited
+        disc = self.disc
+        low = self.low
+        size = self.size
+        bonus = self.bonus
+        visited[root] = stamp
+        disc[root] = 0
+        counter = 1
+        best = 0
+        for start in G[root]:
+            if seen[start] != stamp or owner[start] != p or visited[start] == stamp:
+                continue
+            visited[start] = stamp
+            disc[start] = low[start] = counter
+            counter += 1
+            size[start] = 1
+            bonus[start] = 0
+            stack = [(start, iter(G[start]))]
+            while stack:
+                v, neighbours = stack[-1]
+                for x in neighbours:
+                    if x == root:
+                        low[v] = 0
+                    elif seen[x] == stamp and owner[x] == p:
+                        if visited[x] != stamp:
+                            visited[x] = stamp
+                            disc[x] = low[x] = counter
+                            counter += 1
+                            size[x] = 1
+                            bonus[x] = 0
+                            stack.append((x, iter(G[x])))
+                            break
+                        elif disc[x] < low[v]:
+                            low[v] = disc[x]
+                else:
+                    stack.pop()
+                    if not stack:
+                        break
+                    u = stack[-1][0]
+                    if low[v] >= disc[u]:
+                        # u is an articulation point: the subtree of v is a chamber of its own
+                        if size[v] + bonus[v] > bonus[u]:
+                            bonus[u] = size[v] + bonus[v]
+                    else:
+                        size[u] += size[v]
+                        if bonus[v] > bonus[u]:
+                            bonus[u] = bonus[v]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+            # Each neighbour of the endpoint starts its own chamber: the snake leaves the endpoint once
+            if size[start] + bonus[start] > best:
+                best = size[start] + bonus[start]
+        return best
+
+    def __call__(self, state: GameState, player: int) -> int:
+        """
+        :param state: (GameState) The game state (a logic.GameState).
+        :param player: (int) The player the value is computed for.
+        :return: (int) Estimated number of moves left to player minus that of the opponent.
+        """
+        self.set_graph(state.G)
+        self.calls += 1
+        self.stamp += 1
+        sizes = self.territories(state)
+        # Large territories leave room for long paths anyway: their size is used instead
+        paths = [sizes[p] if sizes[p] > self.path_limit else self.longest_path(state.endpoints[p], p)
+                 for p in (0, 1)]
+        return paths[player] - paths[1 - player]
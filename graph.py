@@ -0,0 +1,196 @@
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Set, Iterable, Iterator, Sequence
+
+# Read-only graph structures that can be shared between the referee and the strategies
+# without copying them.
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError('FrozenGraph is read-only')
+
+
+class FrozenGraph(dict):
+    """
+    Immutable adjacency dictionary: maps each node to the frozenset of its neighbors.
+
+    It is a dict subclass so that lookups (G[v], v in G, G.keys()...) are as fast as with a
+    plain dict, but every mutating method raises a TypeError. Since it cannot be modified,
+    copy.copy and copy.deepcopy return the graph itself.
+    """
+    def __init__(self, G: Dict[int, Iterable[int]]):
+        """
+        Build a frozen copy of an adjacency dictionary.
+
+        :param G: (Dict[int, Iterable[int]]) Adjacency dictionary representing the graph.
+        """
+        super().__init__((v, frozenset(nbrs)) for v, nbrs in G.items())
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenGraph, (dict(self),)
+
+
+class CSRGraph(Mapping):
+    """
+    Immutable graph in compressed sparse row form, on the nodes 0..n-1: the neighbours of node v
+    are indices[offsets[v]:offsets[v + 1]], in increasing order. The arrays are stdlib arrays of
+    machine integers, which take 8 bytes per node and 4 bytes per edge end instead of the few
+    hundred bytes per node of a dict of sets.
+
+    It is a read-only mapping like FrozenGraph, so it can be used wherever the game takes an
+    adjacency dictionary: G[v] is a memoryview of the neighbours of v (iteration, len and
+    `in`), `v in G`, len(G), G.keys() and G.items() work as with a dict. Neighbour lookups
+    are a Python method call instead of a dict lookup, so searches are somewhat slower than with
+    a FrozenGraph: use it for graphs that would not fit in memory as dictionaries.
+    """
+    def __init__(self, offsets: Sequence[int], indices: Sequence[int]):
+        """
+        :param offsets: (Sequence[int]) n + 1 increasing values, offsets[0] = 0 (an array, a list or
+                        a NumPy array).
+        :param indices: (Sequence[int]) The neighbours of all the nodes, each neighbour list sorted.
+        """
+        self.offsets = _int_array('q', offsets)
+        self.indices = _int_array('i' if len(self.offsets) <= 1 << 31 else 'q', indices)
+        if not self.offsets or self.offsets[0] != 0 or self.offsets[-1] != len(self.indices):
+            raise ValueError('offsets must start at 0 and end at len(indices)')
+        self.n = len(self.offsets) - 1
+        self._indices = memoryview(self.indices)
+
+    @classmethod
+    def from_dict(cls, G: Dict[int, Iterable[int]]) -> 'CSRGraph':
+        """
+        Build a CSR graph from an adjacency dictionary whose nodes are 0..n-1.
+
+        :param G: (Dict[int, Iterable[int]]) Adjacency dictionary representing the graph.
+        :return: (CSRGraph) The same graph.
+        """
+        n = len(G)
+        if any(v not in G for v in range(n)):
+            raise ValueError('CSRGraph requires the nodes to be 0..n-1')
+        offsets = array('q', [0])
+        indices = array('i' if n <= 1 << 31 else 'q')
+        for v in range(n):
+            indices.extend(sorted(G[v]))
+            offsets.append(len(indices))
+        return cls(offsets, indices)
+
+    def to_dict(self) -> Dict[int, Set[int]]:
+        """
+        :return: (Dict[int, Set[int]]) The graph as an adjacency dictionary.
+        """
+        offsets = self.offsets
+        indices = self.indices
+        return {v: set(indices[offsets[v]:offsets[v + 1]]) for v in range(self.n)}
+
+    def __getitem__(self, v: int) -> memoryview:
+        if not 0 <= v < self.n:
+            raise KeyError(v)
+        return self._indices[self.offsets[v]:self.offsets[v + 1]]
+
+    def __contains__(self, v) -> bool:
+        return isinstance(v, int) and 0 <= v < self.n
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.n))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def degree(self, v: int) -> int:
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def has_edge(self, u: int, v: int) -> bool:
+        """
+        Binary search of v in the sorted neighbours of u.
+        """
+        start, end = self.offsets[u], self.offsets[u + 1]
+        i = bisect_left(self.indices, v, start, end)
+        return i < end and self.indices[i] == v
+
+    def num_edges(self) -> int:
+        return len(self.indices) // 2
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the arrays, in bytes.
+        """
+        return self.offsets.itemsize * len(self.offsets) + self.indices.itemsize * len(self.indices)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CSRGraph):
+            return self.offsets == other.offsets and self.indices == other.indices
+        return NotImplemented
+
+    __hash__ = object.__hash__
+
+    def __repr__(self) -> str:
+        return f"CSRGraph(n={self.n}, m={self.num_edges()})"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # The memoryview cannot be pickled, the arrays can
+        return CSRGraph, (self.offsets, self.indices)
+
+
+def _int_array(typecode: str, values) -> array:
+    """
+    Convert a sequence of integers (list, array, NumPy array...) to a stdlib array.
+    """
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if hasattr(values, 'tolist'):
+        # NumPy arrays: one conversion in C instead of one per element
+        values = values.tolist()
+    return array(typecode, values)
+
+
+def freeze_graph(G: Dict[int, Set[int]]) -> Mapping:
+    """
+    Return a read-only version of the graph, or the graph itself if it is already read-only
+    (a FrozenGraph or a CSRGraph).
+
+    :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph.
+    :return: (Mapping) The read-only graph.
+    """
+    if isinstance(G, (FrozenGraph, CSRGraph)):
+        return G
+    return FrozenGraph(G)
+
+
+def graph_fingerprint(G) -> int:
+    """
+    64-bit hash of the structure of a graph (nodes and edges), the same in every process.
+
+    :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph.
+    :return: (int) The fingerprint.
+    """
+    # Imported here: only the searches that keep caches across games need it
+    import hashlib
+    h = hashlib.blake2b(digest_size=8)
+    for v in sorted(G):
+        h.update(struct.pack("<qI", v, len(G[v])))
+        h.update(struct.pack(f"<{len(G[v])}q", *sorted(G[v])))
+    return int.from_bytes(h.digest(), "little")
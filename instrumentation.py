@@ -0,0 +1,157 @@
+import contextlib
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from logic import Move
+
+# Instrumentation of the searches: each select_move call of a searching strategy fills a
+# SearchStats record, which is handed to the strategy's sink (any callable, for instance a
+# JSONLSink) instead of being printed. A profiler can also be run around each move.
+
+
+@dataclass
+class SearchStats:
+    """
+    What one select_move call did. Counters that do not apply to a strategy stay at 0.
+    """
+    strategy: str                    # class name of the strategy
+    player: int                      # player to move
+    move: Optional[Move] = None      # the selected move
+    nodes: int = 0                   # nodes visited (MCTS: tree nodes created)
+    evaluations: int = 0             # leaves evaluated (MCTS: playouts)
+    proven: int = 0                  # leaves (or the root) solved exactly by the endgame solver
+    cutoffs: int = 0                 # beta cutoffs
+    first_move_cutoffs: int = 0      # beta cutoffs produced by the first move tried
+    tt_probes: int = 0               # transposition table lookups
+    tt_hits: int = 0                 # transposition table lookups that found the position
+    eval_cache_hits: int = 0         # leaf evaluations found in the evaluation cache
+    eval_cache_misses: int = 0       # leaf evaluations computed
+    depth: int = 0                   # depth of the last completed iteration (fixed-depth searches: the depth)
+    max_depth: int = 0               # deepest ply reached
+    elapsed: float = 0.0             # time of the call, in seconds
+    book: bool = False               # the move was taken from the opening book
+    reused: int = 0                  # MCTS: visits of the root kept from the previous move's tree
+    stopped: Optional[str] = None    # MCTS: what ended the search before its playouts ('time', 'nodes', 'early')
+    profile: Optional[str] = None    # profiler report, if a profiler was run
+
+    @property
+    def first_move_cutoff_ratio(self) -> float:
+        """
+        Fraction of the cutoffs produced by the first move tried, a measure of move ordering
+        quality (1.0 is a perfect ordering).
+        """
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        d["move"] = None if self.move is None else [self.move.from_node, self.move.to_node]
+        d["first_move_cutoff_ratio"] = self.first_move_cutoff_ratio
+        d["nodes_per_second"] = self.nodes_per_second
+        return d
+
+
+class JSONLSink:
+    """
+    Sink writing each SearchStats as one JSON line to a file.
+    """
+    def __init__(self, path: str, mode: str = "a"):
+        """
+        :param path: (str) Path of the file.
+        :param mode: (str) 'a' to append to the file, 'w' to overwrite it.
+        """
+        self.file = open(path, mode, encoding="utf-8")
+
+    def __call__(self, stats: SearchStats):
+        self.file.write(json.dumps(stats.as_dict()) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def print_profile(stats: SearchStats):
+    """
+    Sink printing the profiler report of each move to stderr, for profiling runs without a stats file.
+    """
+    if stats.profile is not None:
+        print(f"--- {stats.strategy}, player {stats.player}, {stats.elapsed * 1000:.1f} ms", file=sys.stderr)
+        print(stats.profile, file=sys.stderr)
+
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class Profiler:
+    """
+    Run cProfile or pyinstrument (if installed) around a piece of code and return a text report.
+    """
+    def __init__(self, kind: str, limit: int = 25):
+        """
+        :param kind: (str) 'cprofile' or 'pyinstrument'.
+        :param limit: (int) Number of functions listed in a cProfile report.
+        """
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {kind} (expected one of {', '.join(PROFILERS)})")
+        if kind == "pyinstrument":
+            # Optional dependency, only needed when this profiler is asked for
+            import pyinstrument
+            self.profiler = pyinstrument.Profiler()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.kind = kind
+        self.limit = limit
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self) -> str:
+        """
+        :return: (str) The report of the code run since start().
+        """
+        if self.kind == "pyinstrument":
+            self.profiler.stop()
+            return self.profiler.output_text()
+        self.profiler.disable()
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(self.limit)
+        return out.getvalue()
+
+
+@contextlib.contextmanager
+def measure(strategy: str, player: int, sink: Optional[Callable[[SearchStats], None]] = None,
+            profiler: Optional[str] = None):
+    """
+    Context manager around a select_move call: yields a SearchStats to fill, times the call,
+    runs the profiler if any, and hands the record to the sink when the call returns.
+
+    :param strategy: (str) Name of the strategy.
+    :param player: (int) Player to move.
+    :param sink: (Optional[Callable[[SearchStats], None]]) Function called with the record.
+    :param profiler: (Optional[str]) None, 'cprofile' or 'pyinstrument'.
+    """
+    stats = SearchStats(strategy=strategy, player=player)
+    prof = Profiler(profiler) if profiler is not None else None
+    if prof is not None:
+        prof.start()
+    begin = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.elapsed = time.perf_counter() - begin
+        if prof is not None:
+            stats.profile = prof.stop()
+    if sink is not None:
+        sink(stats)
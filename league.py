@@ -0,0 +1,298 @@
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from strategy import STRATEGIES
+from tournament import GameRecord, GraphSpec, make_graph, play_one
+from utils import pick_random_start
+
+# Round-robin league between strategies: every pair of strategies plays on every graph family,
+# with both colours on the same start nodes. A pairing stops early once a sequential
+# probability ratio test (SPRT) has decided which strategy is stronger.
+
+
+def wilson_interval(wins: int, games: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Wilson score confidence interval of a win rate.
+
+    :param wins: (int) Number of wins.
+    :param games: (int) Number of games.
+    :param z: (float) Quantile of the normal distribution (1.96 for 95 %).
+    :return: (Tuple[float, float]) Lower and upper bounds.
+    """
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class SPRT:
+    """
+    Sequential probability ratio test on the score of strategy A against strategy B.
+    H0: A wins with probability 0.5 - delta, H1: A wins with probability 0.5 + delta.
+    """
+    def __init__(self, delta: float = 0.1, alpha: float = 0.05, beta: float = 0.05):
+        """
+        :param delta: (float) Distance to 0.5 of the win probabilities of both hypotheses.
+        :param alpha: (float) Probability of accepting H1 when H0 is true.
+        :param beta: (float) Probability of accepting H0 when H1 is true.
+        """
+        p0 = 0.5 - delta
+        p1 = 0.5 + delta
+        self.win = math.log(p1 / p0)
+        self.loss = math.log((1 - p1) / (1 - p0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins: int, losses: int) -> float:
+        """
+        :return: (float) Log-likelihood ratio of H1 against H0.
+        """
+        return wins * self.win + losses * self.loss
+
+    def decision(self, wins: int, losses: int) -> Optional[int]:
+        """
+        :return: (Optional[int]) 1 if A is stronger (H1 accepted), -1 if B is stronger (H0 accepted),
+                 None if more games are needed.
+        """
+        llr = self.llr(wins, losses)
+        if llr >= self.upper:
+            return 1
+        if llr <= self.lower:
+            return -1
+        return None
+
+
+@dataclass
+class Pairing:
+    """
+    All the games between two strategies.
+    """
+    a: str
+    b: str
+    records: List[GameRecord] = field(default_factory=list)
+    decision: Optional[int] = None   # see SPRT.decision
+
+    @property
+    def wins_a(self) -> int:
+        return sum(1 for r in self.records if r.winner_strategy == self.a)
+
+    @property
+    def wins_b(self) -> int:
+        return len(self.records) - self.wins_a
+
+
+def elo_ratings(pairings: List[Pairing], prior_games: float = 1.0, iterations: int = 200) -> Dict[str, float]:
+    """
+    Maximum likelihood Bradley-Terry ratings (minorization-maximization algorithm), in Elo points,
+    with a mean of 0. Each pairing gets prior_games virtual games split evenly, so that a
+    strategy that won (or lost) everything still has a finite rating.
+
+    :param pairings: (List[Pairing]) The results.
+    :param prior_games: (float) Number of virtual games per pairing.
+    :param iterations: (int) Number of iterations of the algorithm.
+    :return: (Dict[str, float]) Elo rating of each strategy.
+    """
+    names = sorted({p.a for p in pairings} | {p.b for p in pairings})
+    wins = {name: 0.0 for name in names}
+    games: Dict[Tuple[str, str], float] = {}
+    for p in pairings:
+        n = len(p.records) + prior_games
+        wins[p.a] += p.wins_a + prior_games / 2
+        wins[p.b] += p.wins_b + prior_games / 2
+        games[(p.a, p.b)] = games.get((p.a, p.b), 0.0) + n
+        games[(p.b, p.a)] = games.get((p.b, p.a), 0.0) + n
+
+    gamma = {name: 1.0 for name in names}
+    for _ in range(iterations):
+        new = {}
+        for i in names:
+            denom = sum(n / (gamma[i] + gamma[j]) for (k, j), n in games.items() if k == i)
+            new[i] = wins[i] / denom if denom > 0 else gamma[i]
+        # Normalize (geometric mean 1) to keep the ratings centred on 0
+        log_mean = sum(math.log(g) for g in new.values()) / len(new)
+        gamma = {name: g / math.exp(log_mean) for name, g in new.items()}
+    return {name: 400 * math.log10(g) for name, g in gamma.items()}
+
+
+def _play_task(args) -> Tuple[int, GameRecord]:
+    index, game = args
+    return index, play_one(*game)
+
+
+def round_seed(seeds: List[int], r: int) -> int:
+    """
+    Seed of the r-th round over the graph families: the given seeds, then seeds derived from them
+    once they are all used, so that a long pairing does not replay the same games.
+
+    :param seeds: (List[int]) The seeds of the league.
+    :param r: (int) Number of the round.
+    :return: (int) The seed.
+    """
+    if r < len(seeds):
+        return seeds[r]
+    return random.Random(f"{seeds[r % len(seeds)]}:{r}").getrandbits(31)
+
+
+def pairing_games(pairing: Pairing, specs: List[GraphSpec], seeds: List[int], start: int, count: int) -> List[tuple]:
+    """
+    Arguments of play_one for the games number start..start+count-1 of a pairing. The games cycle
+    over the graph families, with a new seed (see round_seed) each time all the families were
+    played, and go by pairs with the same start nodes, A playing first in the first game of a
+    pair and B in the second.
+    """
+    games = []
+    for i in range(start, start + count):
+        k = i // 2
+        spec = specs[k % len(specs)]
+        seed = round_seed(seeds, k // len(specs))
+        a, b = pick_random_start(make_graph(spec, seed), seed=seed)
+        if i % 2 == 0:
+            games.append((pairing.a, pairing.b, spec, seed, (a, b)))
+        else:
+            games.append((pairing.b, pairing.a, spec, seed, (b, a)))
+    return games
+
+
+def run_league(strategies: List[str], specs: List[GraphSpec], seeds: List[int], max_games: int = 100,
+               batch: int = 10, workers: int = 0, sprt: SPRT = SPRT()) -> List[Pairing]:
+    """
+    Play a round-robin league.
+
+    :param strategies: (List[str]) Names of the strategies, from STRATEGIES.
+    :param specs: (List[GraphSpec]) The graph families.
+    :param seeds: (List[int]) Seeds of the graphs and start nodes.
+    :param max_games: (int) Maximum number of games per pairing.
+    :param batch: (int) Number of games played per pairing between two SPRT checks (made even).
+    :param workers: (int) Number of worker processes, 0 or 1 to play in this process.
+    :param sprt: (SPRT) The stopping test.
+    :return: (List[Pairing]) The results of each pairing.
+    """
+    batch += batch % 2
+    pairings = [Pairing(a, b) for a, b in itertools.combinations(strategies, 2)]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            tasks = []
+            for index, p in enumerate(pairings):
+                played = len(p.records)
+                if p.decision is None and played < max_games:
+                    for game in pairing_games(p, specs, seeds, played, min(batch, max_games - played)):
+                        tasks.append((index, game))
+            if not tasks:
+                break
+            results = pool.map(_play_task, tasks) if pool is not None else map(_play_task, tasks)
+            for index, record in results:
+                pairings[index].records.append(record)
+            for p in pairings:
+                if p.decision is None:
+                    p.decision = sprt.decision(p.wins_a, p.wins_b)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pairings
+
+
+def report(pairings: List[Pairing]) -> dict:
+    """
+    Summary of a league: Elo ratings, win rates with 95 % confidence intervals, first-mover bias.
+
+    :param pairings: (List[Pairing]) The results.
+    :return: (dict) The report, which can be dumped as JSON.
+    """
+    records = [r for p in pairings for r in p.records]
+    ratings = elo_ratings(pairings)
+    strategies = {}
+    for name in sorted(ratings, key=ratings.get, reverse=True):
+        games = sum(1 for r in records if name in r.strategies)
+        wins = sum(1 for r in records if r.winner_strategy == name)
+        low, high = wilson_interval(wins, games)
+        strategies[name] = {"elo": ratings[name], "games": games, "wins": wins,
+                            "winrate": wins / games if games else 0.0, "ci95": [low, high]}
+
+    first_wins = sum(1 for r in records if r.winner == 0)
+    low, high = wilson_interval(first_wins, len(records))
+    by_graph = {}
+    for r in records:
+        g = by_graph.setdefault(r.graph.split('-s')[0], [0, 0])
+        g[0] += r.winner == 0
+        g[1] += 1
+
+    return {
+        "strategies": strategies,
+        "pairings": [{"a": p.a, "b": p.b, "games": len(p.records), "wins_a": p.wins_a, "wins_b": p.wins_b,
+                      "winrate_a": p.wins_a / len(p.records) if p.records else 0.0,
+                      "ci95_a": list(wilson_interval(p.wins_a, len(p.records))),
+                      "decided": {1: p.a, -1: p.b}.get(p.decision)} for p in pairings],
+        "first_player": {"games": len(records), "wins": first_wins,
+                         "winrate": first_wins / len(records) if records else 0.0, "ci95": [low, high],
+                         "by_graph": {name: w / n for name, (w, n) in by_graph.items()}},
+    }
+
+
+def parse_graph(text: str) -> GraphSpec:
+    """
+    Parse a graph family: 'cube:D' or 'erdos:N:P'.
+    """
+    parts = text.split(':')
+    if parts[0] == 'cube' and len(parts) == 2:
+        return GraphSpec(kind='cube', d=int(parts[1]))
+    if parts[0] == 'erdos' and len(parts) == 3:
+        return GraphSpec(kind='erdos', n=int(parts[1]), p=float(parts[2]))
+    raise argparse.ArgumentTypeError(f"Invalid graph family: {text} (expected cube:D or erdos:N:P)")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Snake-in-the-Box round-robin league")
+    ap.add_argument("--strategies", type=str, nargs="+", default=list(STRATEGIES), help="Strategies to compare")
+    ap.add_argument("--graphs", type=parse_graph, nargs="+", default=[GraphSpec('cube', d=5), GraphSpec('erdos')],
+                    help="Graph families, as cube:D or erdos:N:P")
+    ap.add_argument("--seeds", type=int, default=20,
+                    help="Number of seeds (graphs and start nodes) per family, more are derived if needed")
+    ap.add_argument("--max-games", type=int, default=100, help="Maximum number of games per pairing")
+    ap.add_argument("--batch", type=int, default=10, help="Games per pairing between two SPRT checks")
+    ap.add_argument("--delta", type=float, default=0.1, help="SPRT: win probabilities tested are 0.5 +/- delta")
+    ap.add_argument("--workers", type=int, default=0, help="Number of worker processes")
+    ap.add_argument("--out", type=str, default=None, help="Write the report as JSON to this file")
+    return ap.parse_args()
+
+
+def run():
+    args = parse_args()
+    begin = time.perf_counter()
+    pairings = run_league(args.strategies, args.graphs, list(range(args.seeds)), args.max_games, args.batch,
+                          args.workers, SPRT(delta=args.delta))
+    elapsed = time.perf_counter() - begin
+    result = report(pairings)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    print(f"{sum(len(p.records) for p in pairings)} games in {elapsed:.2f}s")
+    print(f"{'strategy':<20} {'elo':>7} {'games':>6} {'winrate':>8}  95 % interval")
+    for name, s in result["strategies"].items():
+        print(f"{name:<20} {s['elo']:7.1f} {s['games']:6d} {s['winrate'] * 100:7.1f}%  "
+              f"[{s['ci95'][0] * 100:.1f}, {s['ci95'][1] * 100:.1f}]")
+    print()
+    for p in result["pairings"]:
+        decided = f"-> {p['decided']}" if p["decided"] else "(undecided)"
+        print(f"{p['a']} vs {p['b']}: {p['wins_a']}-{p['wins_b']} in {p['games']} games {decided}")
+    first = result["first_player"]
+    print()
+    print(f"First player wins {first['winrate'] * 100:.1f}% [{first['ci95'][0] * 100:.1f}, "
+          f"{first['ci95'][1] * 100:.1f}] of {first['games']} games")
+    for name, rate in first["by_graph"].items():
+        print(f"  {name}: {rate * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    run()
@@ -1,5 +1,9 @@
-from typing import Dict, Set, List, Iterable, Optional
+from typing import Dict, Set, FrozenSet, List, Iterable, Optional, Tuple, Sequence
+from collections import OrderedDict
 from dataclasses import dataclass
+from array import array
+from types import MappingProxyType
+import random
 
 # Please do not edit this file.
 # It is very likely that you will require modifications to this file.
@@ -14,6 +18,66 @@ class Move:
     to_node: int
 
 
+# Zobrist hashing: every (node, occupied) and (node, endpoint of player p) pair gets a random
+# 64-bit key, and the hash of a state is the XOR of the keys of its features.
+# The keys are drawn from a fixed seed so that hashes are reproducible between runs.
+ZOBRIST_SEED = 0x5A0B
+SIDE_TO_MOVE_KEY = 0x9E3779B97F4A7C15
+
+
+# Key tables of the last graphs, shared by all the states on them, by id of the graph
+ZOBRIST_CACHE_SIZE = 4
+_zobrist_cache: 'OrderedDict[int, tuple]' = OrderedDict()
+
+
+def zobrist_keys(nodes: Iterable[int]) -> Tuple[Sequence[int], Sequence[int], Sequence[int]]:
+    """
+    Generate the Zobrist keys of the given nodes. They are indexed by node: when the nodes are
+    0..n-1 (as in all the generated graphs) they are stored in arrays of 8 bytes per key,
+    otherwise in dicts. Both are returned through read-only views, since the tables are shared
+    by all the states on a graph (see graph_zobrist_keys).
+
+    :param nodes: (Iterable[int]) The nodes in the graph.
+    :return: (Tuple[Sequence[int], Sequence[int], Sequence[int]]) The keys for occupied nodes,
+             endpoints of player 0 and endpoints of player 1.
+    """
+    rnd = random.Random(ZOBRIST_SEED)
+    nodes = sorted(nodes)
+    bits = rnd.getrandbits
+    if not nodes or (nodes[0] == 0 and nodes[-1] == len(nodes) - 1):
+        # Same draws, in the same order, as for the dicts below
+        keys = array('Q', (bits(64) for _ in range(3 * len(nodes))))
+        return tuple(memoryview(keys[i::3]).toreadonly() for i in range(3))
+    occupied, end0, end1 = {}, {}, {}
+    for v in nodes:
+        occupied[v] = bits(64)
+        end0[v] = bits(64)
+        end1[v] = bits(64)
+    return MappingProxyType(occupied), MappingProxyType(end0), MappingProxyType(end1)
+
+
+def graph_zobrist_keys(nodes: Iterable[int], G) -> Tuple[Sequence[int], Sequence[int], Sequence[int]]:
+    """
+    The Zobrist keys of a graph, generated once per graph (see zobrist_keys) and shared by all
+    the states on it.
+
+    :param nodes: (Iterable[int]) The nodes in the graph.
+    :param G: (Dict[int, Set[int]]) The adjacency dictionary for the graph.
+    :return: (Tuple[Sequence[int], Sequence[int], Sequence[int]]) As zobrist_keys.
+    """
+    entry = _zobrist_cache.get(id(G))
+    # The graph is kept in the entry so that its id cannot be reused; a mutable graph that got
+    # new nodes needs new keys
+    if entry is not None and entry[0] is G and entry[1] == len(G):
+        _zobrist_cache.move_to_end(id(G))
+        return entry[2]
+    keys = zobrist_keys(nodes)
+    _zobrist_cache[id(G)] = (G, len(G), keys)
+    if len(_zobrist_cache) > ZOBRIST_CACHE_SIZE:
+        _zobrist_cache.popitem(last=False)
+    return keys
+
+
 class GameState:
     """
     Represents the current state of the game, including the positions of the snakes
@@ -26,13 +90,21 @@ class GameState:
         :param nodes: (Iterable[int]) The nodes in the graph.
         :param G: (Dict[int, Set[int]]) The adjacency dictionary for the graph.
         """
-        self.nodes = set(nodes)
+        # Immutable, so that the copies handed to the strategies can share it safely
+        self.nodes: FrozenSet[int] = frozenset(nodes)
         self.G = G
         # Snakes are stored as list of nodes in order from head(start) to tail(current endpoint)
         self.snakes: Dict[int, List[int]] = {0: [], 1: []}
         self.endpoints: Dict[int, Optional[int]] = {0: None, 1: None}
         # Occupied nodes set
         self.occupied: Set[int] = set()
+        # Number of occupied neighbors of each node, kept up to date by _occupy.
+        # Only nodes with at least one occupied neighbor are stored (missing key = 0).
+        self.occupied_neighbors: Dict[int, int] = {}
+        # Zobrist hash of the occupied set and of both endpoints, kept up to date incrementally
+        self.zobrist_occupied, zend0, zend1 = graph_zobrist_keys(self.nodes, G)
+        self.zobrist_endpoint = {0: zend0, 1: zend1}
+        self.hash = 0
 
     def init_snakes(self, start_a: int, start_b: int):
         """
@@ -48,21 +120,86 @@ class GameState:
         self.snakes[1] = [start_b]
         self.endpoints[0] = start_a
         self.endpoints[1] = start_b
-        self.occupied = {start_a, start_b}
+        self.occupied = set()
+        self.occupied_neighbors = {}
+        self.hash = self.zobrist_endpoint[0][start_a] ^ self.zobrist_endpoint[1][start_b]
+        self._occupy(start_a)
+        self._occupy(start_b)
+
+    def key(self, player: int) -> int:
+        """
+        Zobrist hash of the position with the given player to move.
+
+        :param player: (int) The ID of the player to move, 0 or 1.
+        :return: (int) A 64-bit hash of the occupied nodes, both endpoints and the side to move.
+        """
+        return self.hash ^ SIDE_TO_MOVE_KEY if player else self.hash
+
+    def _occupy(self, v: int):
+        """
+        Mark a node as occupied and update the occupied neighbor counts of its neighbors.
+
+        :param v: (int) The node to occupy.
+        :return: (None)
+        """
+        self.occupied.add(v)
+        self.hash ^= self.zobrist_occupied[v]
+        counts = self.occupied_neighbors
+        for u in self.G[v]:
+            counts[u] = counts.get(u, 0) + 1
+
+    def _release(self, v: int):
+        """
+        Mark an occupied node as free again, reverting _occupy.
+
+        :param v: (int) The node to release.
+        :return: (None)
+        """
+        self.occupied.discard(v)
+        self.hash ^= self.zobrist_occupied[v]
+        counts = self.occupied_neighbors
+        for u in self.G[v]:
+            c = counts[u] - 1
+            if c:
+                counts[u] = c
+            else:
+                del counts[u]
 
     def copy(self):
         """
-        Create a deep copy of the current game state.
+        Create a copy of the current game state. The graph and the Zobrist key tables are shared, not copied.
 
-        :return: (GameState) A deep copy of the current game state.
+        :return: (GameState) A copy of the current game state.
         """
-        import copy as _c
-        new = GameState(self.nodes, self.G)
-        new.snakes = _c.deepcopy(self.snakes)
+        new = GameState.__new__(GameState)
+        # The node set is a frozenset and the game graph is frozen (see graph.freeze_graph): both
+        # can be shared without letting a strategy modify the referee's state
+        new.nodes = self.nodes
+        new.G = self.G
+        new.snakes = {0: list(self.snakes[0]), 1: list(self.snakes[1])}
         new.endpoints = dict(self.endpoints)
         new.occupied = set(self.occupied)
+        new.occupied_neighbors = dict(self.occupied_neighbors)
+        # The key tables are read-only views, shared with the referee and all the other states
+        new.zobrist_occupied = self.zobrist_occupied
+        new.zobrist_endpoint = self.zobrist_endpoint
+        new.hash = self.hash
         return new
 
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __getstate__(self):
+        # The read-only views cannot be pickled: the keys are looked up again when unpickling
+        state = dict(self.__dict__)
+        del state['zobrist_occupied'], state['zobrist_endpoint']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.zobrist_occupied, zend0, zend1 = graph_zobrist_keys(self.nodes, self.G)
+        self.zobrist_endpoint = {0: zend0, 1: zend1}
+
 
 # Rule checks
 
@@ -99,11 +236,17 @@ def is_move_legal(state: GameState, player: int, move: Move) -> bool:
     #  Basic checks: the intended new note to_node must be neighbor of the head of the snake
     if move.to_node not in state.G[move.from_node]:
         return False
-    # Simulate the move and check the induced path property
-    new_occupied = set(state.occupied)
-    new_occupied.add(move.to_node)
-    # Update adjacency for snake endpoints: note that interior nodes were already adjacent
-    return _check_induced_path_property(new_occupied, state.G)
+    # Check the induced path property locally: occupying to_node only changes the
+    # occupied neighbor count of to_node itself and of its occupied neighbors.
+    # This gives the same answer as _check_induced_path_property on the new occupied set,
+    # since the property already held before the move.
+    counts = state.occupied_neighbors
+    if counts.get(move.to_node, 0) > 2:
+        return False
+    for u in state.G[move.to_node]:
+        if u in state.occupied and counts.get(u, 0) >= 2:
+            return False
+    return True
 
 
 def apply_move(state: GameState, player: int, move: Move) -> None:
@@ -118,7 +261,26 @@ def apply_move(state: GameState, player: int, move: Move) -> None:
     # We assume here that the move is legal; legality should be checked before calling this function
     state.snakes[player].append(move.to_node)
     state.endpoints[player] = move.to_node
-    state.occupied.add(move.to_node)
+    keys = state.zobrist_endpoint[player]
+    state.hash ^= keys[move.from_node] ^ keys[move.to_node]
+    state._occupy(move.to_node)
+
+
+def undo_move(state: GameState, player: int, move: Move) -> None:
+    """
+    Undo a move previously applied with apply_move. Moves must be undone in the reverse
+    order of their application.
+
+    :param state: (GameState) The current game state.
+    :param player: (int) The ID of the player who played the move, 0 or 1.
+    :param move: (Move) The move to undo, which must be the last move of this player.
+    :return: (None)
+    """
+    state.snakes[player].pop()
+    state.endpoints[player] = move.from_node
+    keys = state.zobrist_endpoint[player]
+    state.hash ^= keys[move.from_node] ^ keys[move.to_node]
+    state._release(move.to_node)
 
 def get_legal_moves(state: GameState, G: Dict[int, Set[int]], player: int) -> List[Move]:
     """
@@ -1,8 +1,10 @@
 import argparse
-from utils import random_erdos_renyi, hypercube, pick_random_start, num_vertices
+from utils import random_erdos_renyi, random_erdos_renyi_fast, random_erdos_renyi_csr
+from utils import hypercube, pick_random_start, num_vertices
+from graph import CSRGraph
 from game import Game
-from ui import interactive_view
 from strategy import STRATEGIES
+from instrumentation import JSONLSink, PROFILERS, print_profile
 
 # Feel free to edit this file and to add new ones!
 
@@ -11,19 +13,32 @@ def parse_args():
     ap.add_argument("--graph", type=str, default="erdos", choices=["erdos", "cube"], help="Graph type")
     ap.add_argument("--n", type=int, default=30, help="Graph size (Erdos-Renyi)")
     ap.add_argument("--p", type=float, default=0.08, help="Edge probability (Erdos-Renyi)")
+    ap.add_argument("--generator", type=str, default="pairs", choices=["pairs", "skip", "numpy"],
+                    help="Erdos-Renyi generator: one draw per pair (same graphs as before for a given seed), "
+                         "geometric skips in O(n+m), or the NumPy version of the skips (large graphs, implies --csr)")
+    ap.add_argument("--csr", action="store_true", help="Store the graph in compact CSR form (large graphs)")
     ap.add_argument("--d", type=int, default=5, help="Dimension for hypercube")
     ap.add_argument("--s0", type=str, default="random", help="Strategy for player 0")
     ap.add_argument("--s1", type=str, default="random", help="Strategy for player 1")
     ap.add_argument("--seed", type=int, default=None, help="Random seed for start positions")
     ap.add_argument("--verbose", action="store_true", help="Print moves")
     ap.add_argument("--ui", action="store_true", help="Run using the graphical UI instead of strategies")
+    ap.add_argument("--stats", type=str, default=None, help="Append the search statistics of each move to this JSONL file")
+    ap.add_argument("--profile", type=str, default=None, choices=PROFILERS, help="Profile each move of the strategies (reports go to the --stats file, or to stderr)")
+    ap.add_argument("--book", type=str, default=None, help="Opening book file of the graph family (see opening_book.py)")
     return ap.parse_args()
 
 def build_graph(args):
     if args.graph == "erdos":
-        return random_erdos_renyi(args.n, args.p, seed=args.seed)
+        if args.generator == "numpy":
+            return CSRGraph(*random_erdos_renyi_csr(args.n, args.p, seed=args.seed))
+        elif args.generator == "skip":
+            G = random_erdos_renyi_fast(args.n, args.p, seed=args.seed)
+        else:
+            G = random_erdos_renyi(args.n, args.p, seed=args.seed)
     elif args.graph == "cube":
-        return hypercube(args.d)
+        G = hypercube(args.d)
+    return CSRGraph.from_dict(G) if args.csr else G
 
 def run():
     args = parse_args()
@@ -36,15 +51,33 @@ def run():
             print("UI mode is not supported for large graphs. Falling back to normal mode.")
         else:
             print("Launching UI mode…")
-            interactive_view(G, a, b, pause=0.7)
+            # Imported here so that headless runs do not load matplotlib and networkx
+            from ui import interactive_view
+            interactive_view(G.to_dict() if isinstance(G, CSRGraph) else G, a, b, pause=0.7)
             return
 
     # Strategy mode
     s0 = STRATEGIES[args.s0]()
     s1 = STRATEGIES[args.s1]()
+    sink = JSONLSink(args.stats) if args.stats else None
+    if sink is not None or args.profile:
+        # Without a stats file, the profiler reports are printed
+        report = sink if sink is not None else print_profile
+        s0.instrument(report, args.profile)
+        s1.instrument(report, args.profile)
+    if args.book:
+        # Imported here: games without a book do not need it
+        from opening_book import OpeningBook
+        book = OpeningBook(args.book)
+        s0.use_book(book)
+        s1.use_book(book)
 
     game = Game(G, a, b)
-    winner = game.play_game(s0, s1, verbose=args.verbose)
+    try:
+        winner = game.play_game(s0, s1, verbose=args.verbose)
+    finally:
+        if sink is not None:
+            sink.close()
     print("Winner:", winner)
 
 if __name__ == '__main__':
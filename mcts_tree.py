@@ -0,0 +1,155 @@
+import math
+from array import array
+from typing import List, Optional, Tuple
+
+# Compact storage of a Monte Carlo search tree.
+# A node is an index into flat arrays of C integers (array module), 28 bytes per node
+# instead of an object holding a copy of the game state. The children of a node are created
+# together when the node is first reached, as a contiguous block, in the order in which they
+# are tried. Positions are not stored: the search rebuilds them by playing the moves from the
+# root, and only the node each move goes to is kept (the move starts at the endpoint of the
+# player to move). The player to move alternates with the depth, so it is not stored either.
+
+NO_NODE = -1
+
+
+class MCTSTree:
+    """
+    Search tree in parallel arrays, node 0 is the root. The wins of a node are those of the
+    player who moved into it. The first tried[v] children of v have been tried, the others
+    are the untried moves of v.
+    """
+    def __init__(self):
+        self.parent = array('i', [NO_NODE])
+        self.to_node = array('i', [NO_NODE])
+        self.visits = array('i', [0])
+        self.wins = array('i', [0])
+        self.first_child = array('i', [0])
+        # -1 until the moves of the node are generated
+        self.num_children = array('i', [-1])
+        self.tried = array('i', [0])
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def nbytes(self) -> int:
+        """
+        :return: (int) Size of the arrays of the tree, in bytes.
+        """
+        return sum(a.itemsize * len(a) for a in (self.parent, self.to_node, self.visits, self.wins,
+                                                self.first_child, self.num_children, self.tried))
+
+    def expanded(self, node: int) -> bool:
+        return self.num_children[node] >= 0
+
+    def expand(self, node: int, to_nodes: List[int]):
+        """
+        Create the children of a node.
+
+        :param node: (int) The node.
+        :param to_nodes: (List[int]) Destination of each move, in the order in which they will be tried.
+        """
+        k = len(to_nodes)
+        self.first_child[node] = len(self.parent)
+        self.num_children[node] = k
+        self.parent.extend(array('i', [node]) * k)
+        self.to_node.extend(to_nodes)
+        zeros = array('i', [0]) * k
+        self.visits.extend(zeros)
+        self.wins.extend(zeros)
+        self.first_child.extend(zeros)
+        self.tried.extend(zeros)
+        self.num_children.extend(array('i', [-1]) * k)
+
+    def try_next(self, node: int) -> int:
+        """
+        :return: (int) The next untried child of the node, now tried, or NO_NODE if all were tried.
+        """
+        i = self.tried[node]
+        if i >= self.num_children[node]:
+            return NO_NODE
+        self.tried[node] = i + 1
+        return self.first_child[node] + i
+
+    def best_child(self, node: int) -> int:
+        """
+        :return: (int) The tried child of the node with the best UCB1 score, as MonteCarloTreeSearchStrategy.get_best_child.
+        """
+        visits = self.visits
+        wins = self.wins
+        sqrt = math.sqrt
+        c_ucb = sqrt(2)
+        log_n = math.log(visits[node])
+        best_score = -float('inf')
+        best = NO_NODE
+        first = self.first_child[node]
+        for c in range(first, first + self.tried[node]):
+            n = visits[c]
+            score = (wins[c] / n) + c_ucb * sqrt(log_n / n)
+            if score > best_score:
+                best_score = score
+                best = c
+        return best
+
+    def child_by_move(self, node: int, to_node: int) -> int:
+        """
+        :return: (int) The tried child of the node reached by the move to to_node, or NO_NODE.
+        """
+        first = self.first_child[node]
+        for c in range(first, first + self.tried[node]):
+            if self.to_node[c] == to_node:
+                return c
+        return NO_NODE
+
+    def backpropagate(self, node: int, wins0: int, n: int, mover: int):
+        """
+        Add the results of n playouts from a node, wins0 of them won by player 0.
+
+        :param mover: (int) The player who moved into the node.
+        """
+        visits = self.visits
+        wins = self.wins
+        parent = self.parent
+        wins1 = n - wins0
+        while node != NO_NODE:
+            visits[node] += n
+            wins[node] += wins0 if mover == 0 else wins1
+            mover = 1 - mover
+            node = parent[node]
+
+    def root_children(self) -> List[Tuple[int, int, int]]:
+        """
+        :return: (List[Tuple[int, int, int]]) (destination of the move, visits, wins) for each tried child of the root.
+        """
+        first = self.first_child[0]
+        return [(self.to_node[c], self.visits[c], self.wins[c]) for c in range(first, first + self.tried[0])]
+
+    def subtree(self, node: int, limit: Optional[int] = None) -> Optional['MCTSTree']:
+        """
+        Copy the subtree of a node into a new tree whose root it is. The rest of the tree is not
+        referenced by the copy.
+
+        :param node: (int) The new root.
+        :param limit: (Optional[int]) Largest number of nodes of the copy.
+        :return: (Optional[MCTSTree]) The copy, or None if it would have more than limit nodes.
+        """
+        tree = MCTSTree()
+        tree.visits[0] = self.visits[node]
+        tree.wins[0] = self.wins[node]
+        # Pairs (node of this tree, its copy), breadth first: the children of each node are copied as a block
+        queue = [(node, 0)]
+        for old, new in queue:
+            k = self.num_children[old]
+            if k < 0:
+                continue
+            first = self.first_child[old]
+            tree.expand(new, self.to_node[first:first + k].tolist())
+            tree.tried[new] = self.tried[old]
+            if limit is not None and len(tree) > limit:
+                return None
+            new_first = tree.first_child[new]
+            for i in range(k):
+                tree.visits[new_first + i] = self.visits[first + i]
+                tree.wins[new_first + i] = self.wins[first + i]
+                queue.append((first + i, new_first + i))
+        return tree
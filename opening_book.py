@@ -0,0 +1,262 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from logic import GameState, Move, apply_move, undo_move, get_legal_moves, is_move_legal
+from symmetry import hypercube_dimension, canonical_transform, canonical_key, distinct_start_pairs
+from utils import hypercube, random_erdos_renyi, pick_random_start
+from graph import graph_fingerprint
+
+# Opening books: the best move of every position of the first plies of the games of a graph
+# family, searched once and for all much deeper than a live search can afford.
+#
+#   python opening_book.py --graph cube --d 8 --plies 4            # books/cube-d8.book
+#   python opening_book.py --graph erdos --n 30 --seeds 0 100      # books/erdos-n30-p0.08.book
+#   python main.py --graph cube --d 8 --s0 alphabetafn --book books/cube-d8.book
+#
+# A book file is a 16-byte header (magic, number of plies, number of entries) followed by
+# 16-byte entries (key, from node, to node) sorted by key, and is memory-mapped: a lookup is
+# a binary search that only reads the pages it needs. The key of a position is its Zobrist key
+# (the canonical one on hypercubes, see symmetry.py, where the moves are stored in canonical
+# coordinates) XOR the fingerprint of the graph, so that one file can hold the books of all the
+# graphs of a family.
+
+MAGIC = b"SNKBOOK1"
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<QII")
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+
+
+class BookGraph:
+    """
+    What the book needs to know about a graph: its fingerprint and whether it is a hypercube.
+    Both are computed once per graph.
+    """
+    def __init__(self, G):
+        self.G = G
+        self.fingerprint = graph_fingerprint(G)
+        self.cube_dim = hypercube_dimension(G)
+
+    def key(self, state: GameState, player: int) -> Tuple[int, Callable[[Move], Move]]:
+        """
+        :return: (Tuple[int, Callable[[Move], Move]]) The book key of the position, and the function
+                 mapping a move stored in the book to a move of the position.
+        """
+        if self.cube_dim is None:
+            return state.key(player) ^ self.fingerprint, lambda m: m
+        t = canonical_transform(state.snakes, self.cube_dim)
+        return canonical_key(state, player, self.cube_dim, t) ^ self.fingerprint, t.unmap_move
+
+    def stored_move(self, state: GameState, move: Move) -> Move:
+        """
+        :return: (Move) The move as stored in the book (in canonical coordinates on hypercubes).
+        """
+        if self.cube_dim is None:
+            return move
+        return canonical_transform(state.snakes, self.cube_dim).map_move(move)
+
+
+class OpeningBook:
+    """
+    Read-only opening book, memory-mapped from a file written by write_book().
+    """
+    def __init__(self, path: str):
+        """
+        :param path: (str) Path of the book file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            # An empty book cannot be mapped
+            size = os.fstat(f.fileno()).st_size
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > HEADER.size else f.read()
+        magic, self.plies, self.size = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        if len(self.data) != HEADER.size + self.size * ENTRY.size:
+            raise ValueError(f"{path} is truncated")
+        self.graph: Optional[BookGraph] = None
+        # Statistics
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def find(self, key: int) -> Optional[Move]:
+        """
+        Binary search of a key.
+
+        :return: (Optional[Move]) The stored move, or None if the key is not in the book.
+        """
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, a, b = ENTRY.unpack_from(self.data, HEADER.size + mid * ENTRY.size)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return Move(a, b)
+        return None
+
+    def lookup(self, state: GameState, player: int) -> Optional[Move]:
+        """
+        :param state: (GameState) The game state.
+        :param player: (int) The player to move.
+        :return: (Optional[Move]) The book move of the position, or None if it is not in the book.
+        """
+        if self.graph is None or self.graph.G is not state.G:
+            self.graph = BookGraph(state.G)
+        self.probes += 1
+        key, unmap = self.graph.key(state, player)
+        move = self.find(key)
+        if move is None:
+            return None
+        move = unmap(move)
+        # A different position with the same key would give a move that is most likely illegal
+        if move.from_node != state.endpoints[player] or not is_move_legal(state, player, move):
+            return None
+        self.hits += 1
+        return move
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+def write_book(path: str, entries: Dict[int, Move], plies: int):
+    """
+    Write a book file.
+
+    :param path: (str) Path of the file, overwritten.
+    :param entries: (Dict[int, Move]) Stored move by key.
+    :param plies: (int) Number of plies of the book, kept in the header.
+    """
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, plies, len(entries)))
+        for key in sorted(entries):
+            move = entries[key]
+            f.write(ENTRY.pack(key, move.from_node, move.to_node))
+
+
+def read_entries(path: str) -> Dict[int, Move]:
+    """
+    :return: (Dict[int, Move]) The entries of a book file, to extend it.
+    """
+    book = OpeningBook(path)
+    entries = {}
+    for i in range(book.size):
+        k, a, b = ENTRY.unpack_from(book.data, HEADER.size + i * ENTRY.size)
+        entries[k] = Move(a, b)
+    book.close()
+    return entries
+
+
+def build_book(G, starts: List[Tuple[int, int]], plies: int, search: Callable[[GameState, int], Move],
+               entries: Optional[Dict[int, Move]] = None, progress: bool = False) -> Dict[int, Move]:
+    """
+    Search the best move of every position of the first plies of the games from the given start
+    pairs. All the moves of both players are followed, so both players find their moves in the
+    book whatever their opponent plays; positions that are the same up to symmetry (hypercubes)
+    are only searched once.
+
+    :param G: (Dict[int, Set[int]]) The graph (frozen).
+    :param starts: (List[Tuple[int, int]]) Start nodes of player 0 and player 1.
+    :param plies: (int) Number of plies of the book: positions with fewer moves played are searched.
+    :param search: (Callable[[GameState, int], Move]) Best move of a position, for instance the
+                   select_move of a deep alpha-beta search.
+    :param entries: (Optional[Dict[int, Move]]) Book to extend (positions already in it are not searched again).
+    :param progress: (bool) Print the number of positions searched to stderr.
+    :return: (Dict[int, Move]) Stored move by key.
+    """
+    graph = BookGraph(G)
+    entries = {} if entries is None else entries
+    seen = set()
+
+    def visit(state: GameState, player: int, ply: int):
+        key, _ = graph.key(state, player)
+        if key in seen:
+            return
+        seen.add(key)
+        legal = get_legal_moves(state, G, player)
+        if not legal:
+            return
+        if key not in entries:
+            entries[key] = graph.stored_move(state, search(state.copy(), player))
+            if progress and len(entries) % 100 == 0:
+                print(f"{len(entries)} positions", file=sys.stderr)
+        if ply + 1 >= plies:
+            return
+        for move in legal:
+            apply_move(state, player, move)
+            visit(state, 1 - player, ply + 1)
+            undo_move(state, player, move)
+
+    for a, b in starts:
+        state = GameState(G.keys(), G)
+        state.init_snakes(a, b)
+        visit(state, 0, 0)
+    return entries
+
+
+def book_path(args) -> str:
+    """
+    :return: (str) Default file of the book of a graph family, in BOOK_DIR.
+    """
+    if args.graph == "cube":
+        return os.path.join(BOOK_DIR, f"cube-d{args.d}.book")
+    return os.path.join(BOOK_DIR, f"erdos-n{args.n}-p{args.p}.book")
+
+
+def main():
+    from graph import freeze_graph
+    from strategy import STRATEGIES
+
+    ap = argparse.ArgumentParser(description="Precompute an opening book for a graph family")
+    ap.add_argument("--graph", type=str, default="cube", choices=["erdos", "cube"], help="Graph type")
+    ap.add_argument("--d", type=int, default=5, help="Dimension for hypercube")
+    ap.add_argument("--n", type=int, default=30, help="Graph size (Erdos-Renyi)")
+    ap.add_argument("--p", type=float, default=0.08, help="Edge probability (Erdos-Renyi)")
+    ap.add_argument("--seeds", type=int, nargs=2, default=[0, 10], metavar=("FIRST", "END"),
+                    help="Erdos-Renyi: seeds of the graphs and start pairs (as main.py --seed), FIRST to END-1")
+    ap.add_argument("--plies", type=int, default=4, help="Number of plies of the book")
+    ap.add_argument("--depth", type=int, default=8, help="Search depth of the book moves")
+    ap.add_argument("--strategy", type=str, default="alphabetafn", help="Alpha-beta strategy searching the moves")
+    ap.add_argument("--workers", type=int, default=0, help="Worker processes of each search")
+    ap.add_argument("--out", type=str, default=None, help="Book file (default: books/<graph family>.book)")
+    ap.add_argument("--extend", action="store_true", help="Add to the existing book instead of replacing it")
+    args = ap.parse_args()
+
+    if args.graph == "cube":
+        # Every start pair is the image of one of these by a symmetry
+        G = freeze_graph(hypercube(args.d))
+        jobs = [(G, [pair for pair, _ in distinct_start_pairs(args.d)])]
+    else:
+        jobs = []
+        for seed in range(*args.seeds):
+            G = freeze_graph(random_erdos_renyi(args.n, args.p, seed=seed))
+            jobs.append((G, [pick_random_start(G, seed=seed)]))
+
+    path = args.out or book_path(args)
+    entries = read_entries(path) if args.extend and os.path.exists(path) else {}
+    strategy = STRATEGIES[args.strategy](depth=args.depth, workers=args.workers, symmetric=True)
+    begin = time.perf_counter()
+    try:
+        for G, starts in jobs:
+            build_book(G, starts, args.plies, lambda state, player: strategy.select_move(state, G, player),
+                       entries, progress=True)
+    finally:
+        strategy.close()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_book(path, entries, args.plies)
+    print(f"{len(entries)} positions written to {path} in {time.perf_counter() - begin:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
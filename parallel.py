@@ -0,0 +1,185 @@
+from typing import Dict, List, Optional, Tuple
+import sys
+
+from logic import GameState, Move, apply_move, undo_move
+
+# Worker side of the parallel searches.
+# The graph is sent once to each worker process by the pool initializer and kept in the
+# module-level _worker dict, tasks then only carry the snakes of the position to search.
+
+_worker = {}
+
+# Smallest value of a search (a lost game), all values fit in a signed 64-bit integer
+LOST_VALUE = -sys.maxsize - 1
+
+
+def make_pool(workers: int, initializer, initargs):
+    """
+    Create a process pool whose workers are initialized once with the given function.
+
+    :param workers: (int) Number of worker processes.
+    :param initializer: (callable) Function run once in each worker.
+    :param initargs: (tuple) Arguments of the initializer (the graph should be one of them).
+    :return: (ProcessPoolExecutor) The pool.
+    """
+    # Imported here: sequential searches (the default) do not need to load multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+
+
+def _init_graph(G):
+    _worker['G'] = G
+    # Empty state used as a template: copying it shares the node set and the Zobrist keys
+    _worker['empty'] = GameState(G.keys(), G)
+
+
+def state_from_snakes(snakes: Dict[int, List[int]]) -> GameState:
+    """
+    Rebuild a game state in a worker from the snakes of both players.
+
+    :param snakes: (Dict[int, List[int]]) The snakes, from head to endpoint.
+    :return: (GameState) The corresponding game state on the worker's graph.
+    """
+    state = _worker['empty'].copy()
+    state.init_snakes(snakes[0][0], snakes[1][0])
+    for player in (0, 1):
+        snake = snakes[player]
+        for i in range(1, len(snake)):
+            apply_move(state, player, Move(snake[i - 1], snake[i]))
+    return state
+
+
+# Alpha-beta root splitting
+
+def init_alphabeta_worker(G, strategy_class, tt_size: int, shared_alpha, symmetric: bool = False,
+                          endgame: int = 14, eval_cache: int = 1 << 16):
+    """
+    Pool initializer for the parallel alpha-beta search.
+
+    :param G: (Dict[int, Set[int]]) The graph, sent once per worker.
+    :param strategy_class: (type) The AlphaBetaStrategy subclass whose search is run.
+    :param tt_size: (int) Size of the worker's own transposition table.
+    :param shared_alpha: (multiprocessing.Value) Best exact root value found so far.
+    :param symmetric: (bool) symmetric option of the strategy.
+    :param endgame: (int) endgame option of the strategy.
+    :param eval_cache: (int) eval_cache option of the strategy.
+    """
+    _init_graph(G)
+    _worker['strategy'] = strategy_class(depth=1, tt_size=tt_size, symmetric=symmetric, endgame=endgame,
+                                         eval_cache=eval_cache)
+    _worker['strategy'].set_graph(G)
+    _worker['alpha'] = shared_alpha
+
+
+def new_shared_alpha():
+    """
+    :return: (multiprocessing.Value) A shared signed 64-bit integer for the root alpha bound.
+    """
+    import multiprocessing
+    return multiprocessing.Value('q', LOST_VALUE)
+
+
+def search_root_move(snakes: Dict[int, List[int]], player: int, move: Move, depth: int,
+                     deadline: Optional[float]) -> Tuple[Optional[int], tuple]:
+    """
+    Search one root move in a worker: the min node reached after playing it.
+
+    The search window starts just below the best root value found so far by all workers, so
+    that a move as good as the best one still gets its exact value (needed to break ties like
+    the sequential search does). A better exact value is published to the other workers.
+
+    :param snakes: (Dict[int, List[int]]) Snakes of the root position.
+    :param player: (int) The root player.
+    :param move: (Move) The root move to search.
+    :param depth: (int) Search depth of the root.
+    :param deadline: (Optional[float]) time.time() after which the search is abandoned.
+    :return: (Tuple[Optional[int], tuple]) The value of the move, exact if it is above the window,
+             an upper bound otherwise, or None if the deadline was reached; and the counters of
+             the search (see AlphaBetaStrategy.add_counters).
+    """
+    from strategy import SearchTimeout
+
+    strategy = _worker['strategy']
+    shared_alpha = _worker['alpha']
+    state = state_from_snakes(snakes)
+    strategy.root_player = player
+    strategy.deadline = deadline
+    strategy.tt.new_search()
+    strategy.check_endgame(state)
+    strategy.reset_counters()
+    strategy.min_remaining = depth
+    tt_probes, tt_hits = strategy.tt.probes, strategy.tt.hits
+    eval_hits, eval_misses = strategy.eval_cache_counts()
+
+    alpha = shared_alpha.value - 1
+    apply_move(state, player, move)
+    try:
+        value, _ = strategy.minValue(state, 1 - player, depth - 1, alpha, float('inf'))
+    except SearchTimeout:
+        value = None
+    finally:
+        undo_move(state, player, move)
+    hits, misses = strategy.eval_cache_counts()
+    counters = (strategy.nodes, strategy.evaluations, strategy.proven, strategy.cutoffs,
+                strategy.first_move_cutoffs, strategy.tt.probes - tt_probes, strategy.tt.hits - tt_hits,
+                hits - eval_hits, misses - eval_misses, strategy.min_remaining)
+
+    if value is not None and value > alpha:
+        with shared_alpha.get_lock():
+            if value > shared_alpha.value:
+                shared_alpha.value = value
+    return value, counters
+
+
+# Monte Carlo tree search
+
+def init_mcts_worker(G, strategy_class, batch_rollouts: int = 0):
+    """
+    Pool initializer for the parallel MCTS.
+
+    :param G: (Dict[int, Set[int]]) The graph, sent once per worker.
+    :param strategy_class: (type) The MonteCarloTreeSearchStrategy (sub)class whose search is run.
+    :param batch_rollouts: (int) batch_rollouts option of the strategy.
+    """
+    _init_graph(G)
+    _worker['mcts'] = strategy_class(batch_rollouts=batch_rollouts)
+
+
+def mcts_root_task(snakes: Dict[int, List[int]], player: int, iterations: Optional[int], seed: int,
+                   deadline: Optional[float] = None, max_nodes: Optional[int] = None) -> tuple:
+    """
+    Grow an independent tree from the root position (root parallelisation).
+
+    :param snakes: (Dict[int, List[int]]) Snakes of the root position.
+    :param player: (int) The player to move.
+    :param iterations: (Optional[int]) Number of playouts of this tree, None for no limit.
+    :param seed: (int) Seed of the playouts' random generator, different for every task.
+    :param deadline: (Optional[float]) time.time() at which the search stops.
+    :param max_nodes: (Optional[int]) Largest number of nodes of this tree.
+    :return: (tuple) (move, visits, wins) for each child of the root, the number of nodes, the
+             number of playouts and the depth of the tree, and what stopped the search early.
+    """
+    strategy = _worker['mcts']
+    strategy.reseed(seed)
+    strategy.deadline = deadline
+    strategy.max_nodes = max_nodes
+    state = state_from_snakes(snakes)
+    root = strategy.search(state, player, iterations)
+    children = strategy.root_children(root, state, player)
+    return children, strategy.nodes, strategy.playouts, strategy.max_depth, strategy.stopped
+
+
+def rollout_task(snakes: Dict[int, List[int]], player: int, n: int, seed: int) -> int:
+    """
+    Run n playouts from the same position (leaf parallelisation).
+
+    :param snakes: (Dict[int, List[int]]) Snakes of the position.
+    :param player: (int) The player to move.
+    :param n: (int) Number of playouts.
+    :param seed: (int) Seed of the playouts' random generator, different for every task.
+    :return: (int) Number of playouts won by player 0.
+    """
+    strategy = _worker['mcts']
+    strategy.reseed(seed)
+    state = state_from_snakes(snakes)
+    return strategy.simulation_batch(state, player, n)
@@ -0,0 +1,121 @@
+from typing import Dict, Set, List, Tuple
+import random
+
+from logic import GameState
+
+# Fast random playouts for the Monte Carlo tree search.
+# A playout works on flat copies of the state (one bytearray of occupied flags and one list of
+# occupied neighbour counts, indexed by node index) and never builds Move objects.
+
+
+class RolloutBoard:
+    """
+    Flat representation of a graph for playouts: nodes are numbered 0..n-1 and the neighbours
+    of each node are stored in a tuple.
+    """
+    def __init__(self, G: Dict[int, Set[int]]):
+        """
+        :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph.
+        """
+        self.nodes: List[int] = sorted(G.keys())
+        self.index: Dict[int, int] = {v: i for i, v in enumerate(self.nodes)}
+        index = self.index
+        self.neighbors: List[Tuple[int, ...]] = [tuple(index[u] for u in G[v]) for v in self.nodes]
+        self.n = len(self.nodes)
+
+    def prepare(self, state: GameState) -> Tuple[bytearray, List[int], int, int]:
+        """
+        Convert a game state to the flat representation. The result is only read by playout(),
+        so it can be reused for any number of playouts from the same state.
+
+        :param state: (GameState) The game state.
+        :return: (Tuple[bytearray, List[int], int, int]) Occupied flags, occupied neighbour counts,
+                 and the endpoints of both players (as node indices).
+        """
+        index = self.index
+        occupied = bytearray(self.n)
+        for v in state.occupied:
+            occupied[index[v]] = 1
+        counts = [0] * self.n
+        for v, c in state.occupied_neighbors.items():
+            counts[index[v]] = c
+        return occupied, counts, index[state.endpoints[0]], index[state.endpoints[1]]
+
+
+def legal_moves(board: RolloutBoard, occupied: bytearray, counts: List[int], e: int) -> List[int]:
+    """
+    Legal moves from an endpoint, with the rules of logic.is_move_legal, in the order of
+    logic.get_legal_moves.
+
+    :param board: (RolloutBoard) The graph.
+    :param occupied: (bytearray) Occupied flags, as in RolloutBoard.prepare().
+    :param counts: (List[int]) Occupied neighbour counts, as in RolloutBoard.prepare().
+    :param e: (int) Index of the endpoint.
+    :return: (List[int]) Indices of the nodes the endpoint can move to.
+    """
+    moves = []
+    if counts[e] > 1:
+        return moves
+    neighbors = board.neighbors
+    for v in neighbors[e]:
+        if occupied[v]:
+            continue
+        c = counts[v]
+        if c == 1:
+            moves.append(v)
+        elif c == 2:
+            for u in neighbors[v]:
+                if occupied[u] and u != e:
+                    if counts[u] <= 1:
+                        moves.append(v)
+                    break
+    return moves
+
+
+def playout(board: RolloutBoard, prepared: Tuple[bytearray, List[int], int, int], player: int,
+            rnd: random.Random) -> int:
+    """
+    Play a uniformly random game until a player cannot move.
+
+    :param board: (RolloutBoard) The graph.
+    :param prepared: (Tuple) The starting position, from RolloutBoard.prepare().
+    :param player: (int) The player to move first.
+    :param rnd: (random.Random) The random generator.
+    :return: (int) The winner.
+    """
+    base_occupied, base_counts, end0, end1 = prepared
+    occupied = base_occupied[:]
+    counts = base_counts[:]
+    neighbors = board.neighbors
+    rand = rnd.random
+    ends = [end0, end1]
+    p = player
+
+    while True:
+        e = ends[p]
+        moves = []
+        # The endpoint gets a new occupied neighbour: it must have at most one before the move
+        if counts[e] <= 1:
+            for v in neighbors[e]:
+                if occupied[v]:
+                    continue
+                c = counts[v]
+                if c == 1:
+                    # e is the only occupied neighbour of v
+                    moves.append(v)
+                elif c == 2:
+                    # The other occupied neighbour of v must have at most one occupied neighbour
+                    for u in neighbors[v]:
+                        if occupied[u] and u != e:
+                            if counts[u] <= 1:
+                                moves.append(v)
+                            break
+        if not moves:
+            return 1 - p
+
+        v = moves[int(rand() * len(moves))]
+        occupied[v] = 1
+        for u in neighbors[v]:
+            counts[u] += 1
+        ends[p] = v
+        p = 1 - p
@@ -1,27 +1,97 @@
-from logging import info
+import contextlib
+from functools import partial
 from math import inf
 import math
 import time
-from time import process_time_ns
-from typing import List, Optional
-from logic import GameState, Move, apply_move
-from utils import num_degree,freeNeighbor,BFS,utilMove
 import random
 import sys
-from game import Game
-import copy
-from logic import _check_induced_path_property
-from typing import List, Optional, Dict, Set
-from logic import GameState, Move, get_legal_moves
-import random
+from typing import Callable, List, Optional, Dict, Set
+from logic import GameState, Move, apply_move, undo_move, get_legal_moves
+from rollout import RolloutBoard, playout, legal_moves
+from transposition import TranspositionTable, EvaluationCache, EXACT, LOWER, UPPER
+from parallel import make_pool, init_alphabeta_worker, new_shared_alpha, search_root_move, LOST_VALUE
+from parallel import init_mcts_worker, mcts_root_task, rollout_task
+from utils import freeNeighbor,utilMove
+from instrumentation import SearchStats, measure
+from symmetry import hypercube_dimension, canonical_key
+from endgame import EndgameSolver
+from evaluation import RegionEvaluator
+from graph import graph_fingerprint
+from mcts_tree import MCTSTree, NO_NODE
 
 # This file as well as utils.py should be the only ones you have to edit!
 
+# Random keys mixed into the transposition table keys, see AlphaBetaStrategy.position_key
+ROOT_PLAYER_KEYS = (0x2545F4914F6CDD1D, 0x6A09E667F3BCC909)
+# Value of a leaf proven won by the endgame solver, just below the value of a finished game
+PROVEN_WIN = sys.maxsize - 1
+# The leaves are only given to the endgame solver when the free region of the root has at most
+# this many times its max_region nodes: otherwise they almost never are small enough, and
+# computing their region would cost more than evaluating them
+ENDGAME_REACH = 3
+# The MCTS checks its time budget, its node cap and its early stop every this many iterations
+MCTS_CHECK_EVERY = 16
+
 class Strategy:
     """
     Base strategy class. Students should subclass this and implement select_move,
     as well as any helper methods they need.
     """
+    # Instrumentation, see instrumentation.py: function called with the SearchStats of each
+    # move of the searching strategies, and profiler run around each move (None, 'cprofile'
+    # or 'pyinstrument')
+    stats_sink: Optional[Callable[[SearchStats], None]] = None
+    profiler: Optional[str] = None
+    # Statistics of the last move
+    last_stats: Optional[SearchStats] = None
+    # Opening book looked up before searching, see opening_book.py
+    book = None
+
+    def instrument(self, sink: Optional[Callable[[SearchStats], None]] = None, profiler: Optional[str] = None):
+        """
+        Send the statistics of each move to sink and/or profile each move.
+
+        :param sink: (Optional[Callable[[SearchStats], None]]) Function called with the statistics
+                     of each move, for instance an instrumentation.JSONLSink.
+        :param profiler: (Optional[str]) None, 'cprofile' or 'pyinstrument'.
+        :return: (Strategy) self.
+        """
+        self.stats_sink = sink
+        self.profiler = profiler
+        return self
+
+    def use_book(self, book):
+        """
+        Play the moves of an opening book when the position is in it, instead of searching.
+
+        :param book: (Optional[opening_book.OpeningBook]) The book, None to stop using one.
+        :return: (Strategy) self.
+        """
+        self.book = book
+        return self
+
+    def book_move(self, state: GameState, player: int, stats: SearchStats) -> Optional[Move]:
+        """
+        :return: (Optional[Move]) The book move of the position, None if there is no book or the
+                 position is not in it.
+        """
+        if self.book is None:
+            return None
+        move = self.book.lookup(state, player)
+        if move is not None:
+            stats.move = move
+            stats.book = True
+        return move
+
+    @contextlib.contextmanager
+    def instrumented(self, player: int):
+        """
+        Context manager around the body of select_move, yielding the SearchStats to fill.
+        """
+        with measure(type(self).__name__, player, self.stats_sink, self.profiler) as stats:
+            self.last_stats = stats
+            yield stats
+
     def select_move(self, state: GameState, G: Dict[int, Set[int]], player: int) -> Optional[Move]:
         """
         Select a move for the given player in the given state.
@@ -71,16 +141,26 @@ class MinMaxStrategy(Strategy):
     def select_move(self, state: GameState, G: Dict[int, Set[int]], player: int) -> Optional[Move]:
         depth = 4
 
-        move = None
-        (value,move) = self.maxValue(state,player, depth)
-        print(f'Move retourné : {move}')
+        self.nodes = 0
+        self.evaluations = 0
+        with self.instrumented(player) as stats:
+            move = self.book_move(state, player, stats)
+            if move is not None:
+                return move
+            (value,move) = self.maxValue(state,player, depth)
+            stats.move = move
+            stats.nodes = self.nodes
+            stats.evaluations = self.evaluations
+            stats.depth = stats.max_depth = depth
         return move
 
     def maxValue(self,state :GameState,player :int, depth: int) -> tuple[int,Move | None]:
+        self.nodes += 1
         legal_move = get_legal_moves(state,state.G,player)
         if not legal_move: 
             return (-sys.maxsize -1,None)
         elif depth == 0:
+            self.evaluations += 1
             sommetPlayer = state.endpoints[player]
             assert sommetPlayer is not None
             return (freeNeighbor(state.G,player,state),None)
@@ -88,19 +168,21 @@ class MinMaxStrategy(Strategy):
         v = -inf
         move = None
         for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.minValue(nextState,1-player,depth - 1)
+            apply_move(state,player,a)
+            v2,a2 = self.minValue(state,1-player,depth - 1)
+            undo_move(state,player,a)
             if v2 > v:
                 v = v2
                 move = a
         return (v,move)
 
     def minValue(self,state:GameState,player :int, depth:int)-> tuple[int,Move | None]:
+        self.nodes += 1
         legal_move = get_legal_moves(state,state.G,player)
         if not legal_move: 
             return (sys.maxsize,None)
         elif depth == 0:
+            self.evaluations += 1
             sommetPlayer = state.endpoints[1 - player]
             assert sommetPlayer is not None
             return (freeNeighbor(state.G,1 - player,state),None)
@@ -108,139 +190,474 @@ class MinMaxStrategy(Strategy):
         v = inf
         move = None
         for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.maxValue(nextState,1-player,depth - 1)
+            apply_move(state,player,a)
+            v2,a2 = self.maxValue(state,1-player,depth - 1)
+            undo_move(state,player,a)
             if v2 < v:
                 v = v2
                 move = a
         return (v,move)
 
-class AlphaBetaStrategyDFS(Strategy):
-    # def min_max_search(self, state: GameState,player : int)
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when the time budget of the move is exhausted.
+    """
+    pass
+
+class AlphaBetaStrategy(Strategy):
+    """
+    Alpha-beta search (max/min formulation, values seen from the root player) with a
+    transposition table, shared by AlphaBetaStrategyDFS and AlphaBetaStrategyFN which only
+    differ by their evaluation function and move ordering.
+    """
+    def __init__(self, depth: Optional[int] = 3, time_budget: Optional[float] = None, tt_size: int = 1 << 18,
+                 workers: int = 0, symmetric: bool = False, endgame: int = 14, eval_cache: int = 1 << 16):
+        """
+        The search is an iterative deepening: depths 1, 2, 3... are searched in turn until the
+        maximum depth is reached or the time budget runs out.
+
+        :param depth: (Optional[int]) Maximum search depth, None for no limit (requires a time budget).
+        :param time_budget: (Optional[float]) Time budget per move in seconds, None for no limit.
+        :param tt_size: (int) Number of slots of the transposition table.
+        :param workers: (int) Number of worker processes searching the root moves in parallel,
+                        0 or 1 for a sequential search. Call close() to stop them.
+        :param symmetric: (bool) On hypercubes, key the transposition table on the canonical form of
+                          the positions (see symmetry.py), so that symmetric positions share their
+                          entries. Each key then costs O(d) per occupied node instead of O(1).
+        :param endgame: (int) Leaves whose free region (see endgame.py) has at most this many nodes
+                        are solved exactly instead of evaluated, and the root move is played
+                        without searching when the root is a proven win. 0 to disable.
+        :param eval_cache: (int) Number of leaf evaluations kept from one move to the next (and from
+                           one game to the next on the same graph), 0 to disable.
+        """
+        if depth is None and time_budget is None:
+            raise ValueError('A maximum depth or a time budget is required')
+        self.depth = depth
+        self.time_budget = time_budget
+        # The table is kept from one move to the next: the positions already seen stay useful
+        self.tt = TranspositionTable(tt_size)
+        self.eval_cache = EvaluationCache(eval_cache) if eval_cache else None
+        # Graph of the positions in the table and in the caches, and its structure (see
+        # set_graph)
+        self.graph = None
+        self.graph_fingerprint = None
+        self.root_player = 0
+        self.deadline = None
+        self.reset_counters()
+        # Depth of the last completed iteration
+        self.completed_depth = 0
+        self.workers = workers
+        self.pool = None
+        self.pool_graph = None
+        self.shared_alpha = None
+        self.symmetric = symmetric
+        # Dimension of the hypercube being played when the keys are symmetric, else None
+        self.cube_dim = None
+        self.cube_graph = None
+        self.endgame_region = endgame
+        self.endgame = EndgameSolver(max_region=endgame) if endgame else None
+        self.solve_leaves = False
+
+    def set_graph(self, G: Dict[int, Set[int]]):
+        """
+        Recognize the graph (once per graph) to use symmetric keys on hypercubes. The keys only
+        depend on the node numbers: the table and the caches (evaluations, endgame results) are
+        emptied when the graph changes. A new graph object with the same structure (each game
+        builds its own, see game.Game) keeps them.
+        """
+        if G is not self.graph:
+            fingerprint = graph_fingerprint(G)
+            if self.graph is not None and fingerprint != self.graph_fingerprint:
+                self.tt.clear()
+                if self.eval_cache is not None:
+                    self.eval_cache.clear()
+                if self.endgame is not None:
+                    self.endgame.clear()
+            self.graph = G
+            self.graph_fingerprint = fingerprint
+        if self.symmetric and G is not self.cube_graph:
+            self.cube_dim = hypercube_dimension(G)
+            self.cube_graph = G
+
+    def check_endgame(self, state: GameState):
+        """
+        Decide, at the root, whether the leaves of the search are given to the endgame solver.
+        """
+        self.solve_leaves = (self.endgame is not None
+                             and self.endgame.region(state, ENDGAME_REACH * self.endgame.max_region) is not None)
+
+    def evaluate(self, state: GameState, player: int) -> int:
+        """
+        Evaluate a leaf from the point of view of the given player.
+        """
+        raise NotImplementedError
+
+    def cached_evaluate(self, state: GameState, player: int) -> int:
+        """
+        evaluate(), through the evaluation cache.
+        """
+        cache = self.eval_cache
+        if cache is None:
+            return self.evaluate(state, player)
+        # Evaluations do not depend on the player to move: the key of this player only tells
+        # the point of view apart
+        key = state.key(player)
+        value = cache.get(key)
+        if value is None:
+            value = self.evaluate(state, player)
+            cache.put(key, value)
+        return value
+
+    def order_moves(self, moves: List[Move], state: GameState) -> List[Move]:
+        """
+        Sort the legal moves, best first, to get more cutoffs.
+        """
+        return moves
+
+    def position_key(self, state: GameState, player: int) -> int:
+        # Stored values are seen from the root player, who is therefore part of the key
+        if self.cube_dim is not None:
+            return canonical_key(state, player, self.cube_dim) ^ ROOT_PLAYER_KEYS[self.root_player]
+        return state.key(player) ^ ROOT_PLAYER_KEYS[self.root_player]
+
     def select_move(self, state: GameState, G: Dict[int, Set[int]], player: int) -> Optional[Move]:
-        depth = 3
+        with self.instrumented(player) as stats:
+            legal_move = get_legal_moves(state,G,player)
+            if not legal_move:
+                return None
+            move = self.book_move(state, player, stats)
+            if move is not None:
+                return move
 
-        start_time = time.time()
-        move = None
-        (value,move) = self.maxValue(state,player, depth,-inf,inf,G)
+            start_time = time.time()
+            self.deadline = None if self.time_budget is None else start_time + self.time_budget
+            self.set_graph(G)
+            self.tt.new_search()
+            self.root_player = player
+            self.reset_counters()
+            tt_probes, tt_hits = self.tt.probes, self.tt.hits
+            eval_hits, eval_misses = self.eval_cache_counts()
+            self.completed_depth = 0
+            # No more moves possible than free nodes: no use searching deeper
+            max_depth = len(state.nodes) - len(state.occupied)
+            if self.depth is not None:
+                max_depth = min(max_depth, self.depth)
 
-        end_time = time.time()
-        duree = end_time - start_time
-        print("Durée du tour: ",duree)
-        return move
+            # Endgame solved at the root: the winning move is played directly
+            self.check_endgame(state)
+            if self.solve_leaves:
+                won, winning = self.endgame.best_move(state, player)
+                if won:
+                    stats.move = winning
+                    stats.proven = 1
+                    return winning
 
-    def maxValue(self,state :GameState,player :int, depth: int, α, β,G) -> tuple[int,Move | None]:
-        legal_move = get_legal_moves(state,state.G,player)
-        # Trie des moves en fonction du nombre de voisin pour tenter de trier du meilleur au pire coup pour avoir plus de chance d'élaguer
-        legal_move.sort(key = lambda m: utilMove(m,state,G))
+            move = self.order_moves(legal_move,state)[0]
+            depth = 1
+            search = self.search_root_parallel if self.workers > 1 else self.search_root
+            while depth <= max_depth:
+                self.min_remaining = depth
+                try:
+                    (value,best) = search(state,player,depth,move)
+                except SearchTimeout:
+                    break
+                finally:
+                    stats.max_depth = max(stats.max_depth, depth - self.min_remaining)
+                move = best
+                self.completed_depth = depth
+                # Game won or lost whatever happens
+                if value >= PROVEN_WIN or value <= -PROVEN_WIN:
+                    break
+                # The next iteration would cost much more than the previous one: it is not started
+                # with less than half of the budget left
+                if self.deadline is not None and time.time() - start_time > self.time_budget / 2:
+                    break
+                depth += 1
 
-        if not legal_move: 
-            return (-sys.maxsize -1,None)
-        elif depth == 0:
-            sommetPlayer = state.endpoints[player]
-            assert sommetPlayer is not None
-            return (BFS(state.G,player,state),None)
+            stats.move = move
+            stats.depth = self.completed_depth
+            stats.nodes = self.nodes
+            stats.evaluations = self.evaluations
+            stats.proven = self.proven
+            stats.cutoffs = self.cutoffs
+            stats.first_move_cutoffs = self.first_move_cutoffs
+            # In parallel searches the workers have their own tables, see search_root_parallel
+            stats.tt_probes = self.tt.probes - tt_probes + self.worker_tt_probes
+            stats.tt_hits = self.tt.hits - tt_hits + self.worker_tt_hits
+            hits, misses = self.eval_cache_counts()
+            stats.eval_cache_hits = hits - eval_hits + self.worker_eval_hits
+            stats.eval_cache_misses = misses - eval_misses + self.worker_eval_misses
+            return move
+
+    def reset_counters(self):
+        """
+        Reset the counters of the search statistics (see instrumentation.SearchStats).
+        """
+        self.nodes = 0
+        self.evaluations = 0
+        self.proven = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.worker_tt_probes = 0
+        self.worker_tt_hits = 0
+        self.worker_eval_hits = 0
+        self.worker_eval_misses = 0
+        # Smallest remaining depth of the leaves of the current iteration
+        self.min_remaining = 0
+
+    def add_counters(self, counters: tuple):
+        """
+        Add the counters of a search made by another instance (in a worker process).
+
+        :param counters: (tuple) nodes, evaluations, proven, cutoffs, first_move_cutoffs, tt_probes,
+                         tt_hits, eval_hits, eval_misses and min_remaining of that search.
+        """
+        (nodes, evaluations, proven, cutoffs, first_move_cutoffs, tt_probes, tt_hits, eval_hits, eval_misses,
+         min_remaining) = counters
+        self.nodes += nodes
+        self.evaluations += evaluations
+        self.proven += proven
+        self.cutoffs += cutoffs
+        self.first_move_cutoffs += first_move_cutoffs
+        self.worker_tt_probes += tt_probes
+        self.worker_tt_hits += tt_hits
+        self.worker_eval_hits += eval_hits
+        self.worker_eval_misses += eval_misses
+        self.min_remaining = min(self.min_remaining, min_remaining)
 
+    def eval_cache_counts(self) -> tuple:
+        """
+        :return: (tuple) Hits and misses of the evaluation cache so far, (0, 0) without a cache.
+        """
+        if self.eval_cache is None:
+            return 0, 0
+        return self.eval_cache.hits, self.eval_cache.misses
+
+    def leaf(self, depth: int):
+        """
+        Record a leaf (evaluated or end of game) reached with the given remaining depth.
+        """
+        if depth < self.min_remaining:
+            self.min_remaining = depth
+
+    def search_root(self, state: GameState, player: int, depth: int, pv_move: Move) -> tuple[int,Move]:
+        """
+        Search the root position at the given depth, trying first the best move of the previous
+        iteration (the rest of the principal variation is found in the transposition table).
+
+        :param state: (GameState) The current game state, restored when the search returns.
+        :param player: (int) The ID of the current player, 0 or 1.
+        :param depth: (int) Search depth.
+        :param pv_move: (Move) Best move of the previous iteration.
+        :return: (tuple[int, Move]) The value of the position and the best move.
+        """
+        legal_move = self.order_moves(get_legal_moves(state,state.G,player),state)
+        legal_move.remove(pv_move)
+        legal_move.insert(0,pv_move)
+
+        α = -inf
         v = -inf
         move = None
         for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.minValue(nextState,1-player,depth - 1,α,β,G)
+            apply_move(state,player,a)
+            try:
+                v2,a2 = self.minValue(state,1-player,depth - 1,α,inf)
+            finally:
+                undo_move(state,player,a)
             if v2 > v:
                 v = v2
                 move = a
                 if v > α:
                     α = v
-            if v >= β:
-                return (v,move)
 
+        self.tt.store(self.position_key(state,player),depth,v,EXACT,move)
         return (v,move)
 
-    def minValue(self,state:GameState,player :int, depth:int, α, β,G)-> tuple[int,Move | None]:
-        legal_move = get_legal_moves(state,state.G,player)
-        # Trie des moves en fonction du nombre de voisin pour tenter de trier du meilleur au pire coup pour avoir plus de chance d'élaguer
-        legal_move.sort(key = lambda m: utilMove(m,state,G))
+    def search_root_parallel(self, state: GameState, player: int, depth: int, pv_move: Move) -> tuple[int,Move]:
+        """
+        Same as search_root, but the root moves are searched by the worker processes, which
+        share the best root value found so far as their alpha bound. The first move is searched
+        alone first (young brothers wait) so that the others start with a good bound.
+        The value and the move are the same as with search_root at the same depth.
 
-        if not legal_move: 
-            return (sys.maxsize,None)
-        elif depth == 0:
-            sommetPlayer = state.endpoints[1 - player]
-            assert sommetPlayer is not None
-            return (BFS(state.G,1 - player,state),None)
-        
-        v = inf
-        move = None
-        for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.maxValue(nextState,1-player,depth - 1,α,β,G)
-            if v2 < v:
-                v = v2
-                move = a
+        :param state: (GameState) The current game state.
+        :param player: (int) The ID of the current player, 0 or 1.
+        :param depth: (int) Search depth.
+        :param pv_move: (Move) Best move of the previous iteration.
+        :return: (tuple[int, Move]) The value of the position and the best move.
+        """
+        self.start_pool(state.G)
+        legal_move = self.order_moves(get_legal_moves(state,state.G,player),state)
+        legal_move.remove(pv_move)
+        legal_move.insert(0,pv_move)
 
-                if v<β:
-                    β = v
-            if v <= α:
-                return (v,move)
+        self.shared_alpha.value = LOST_VALUE
+        snakes = {0: list(state.snakes[0]), 1: list(state.snakes[1])}
+        first = self.pool.submit(search_root_move,snakes,player,legal_move[0],depth,self.deadline).result()
+        futures = [self.pool.submit(search_root_move,snakes,player,a,depth,self.deadline) for a in legal_move[1:]]
+        results = [first] + [f.result() for f in futures]
+        values = []
+        for value, counters in results:
+            self.add_counters(counters)
+            values.append(value)
+        if None in values:
+            raise SearchTimeout()
 
+        # Only exact values can reach the maximum: the first move reaching it is taken, as in
+        # the sequential search
+        v = max(values)
+        move = legal_move[values.index(v)]
+        self.tt.store(self.position_key(state,player),depth,v,EXACT,move)
         return (v,move)
 
-class AlphaBetaStrategyFN(Strategy):
-    # def min_max_search(self, state: GameState,player : int)
-    def select_move(self, state: GameState, G: Dict[int, Set[int]], player: int) -> Optional[Move]:
-        depth = 3
+    def start_pool(self, G: Dict[int, Set[int]]):
+        """
+        Start the worker processes, or restart them if the graph changed. The graph is sent
+        to each worker only once.
+        """
+        if self.pool is not None and self.pool_graph is G:
+            return
+        self.close()
+        self.shared_alpha = new_shared_alpha()
+        self.pool = make_pool(self.workers, init_alphabeta_worker,
+                              (G, type(self), self.tt.size, self.shared_alpha, self.symmetric, self.endgame_region,
+                               self.eval_cache.size if self.eval_cache is not None else 0))
+        self.pool_graph = G
 
-        start_time = time.time()
-        move = None
-        (value,move) = self.maxValue(state,player, depth,-inf,inf)
+    def close(self):
+        """
+        Stop the worker processes, if any.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self.pool_graph = None
 
-        end_time = time.time()
-        duree = end_time - start_time
-        print("Durée du tour: ",duree)
-        return move
+    def tick(self):
+        """
+        Count a visited node and check the time budget every 16 nodes.
+        """
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 15 and time.time() > self.deadline:
+            raise SearchTimeout()
+
+    def _probe(self, key: int, depth: int, legal_move: List[Move]):
+        """
+        Look the position up in the transposition table. The stored best move is moved to the
+        front of legal_move.
+
+        :return: the table entry if its depth is the current remaining depth, else None.
+        """
+        entry = self.tt.probe(key)
+        if entry is None:
+            return None
+        if entry.move is not None and entry.move in legal_move:
+            legal_move.remove(entry.move)
+            legal_move.insert(0, entry.move)
+        # Only reuse values searched at exactly this depth, so that the result stays the one of
+        # a plain fixed-depth search
+        if entry.depth != depth:
+            return None
+        return entry
 
     def maxValue(self,state :GameState,player :int, depth: int, α, β) -> tuple[int,Move | None]:
+        self.tick()
         legal_move = get_legal_moves(state,state.G,player)
+
         if not legal_move: 
+            self.leaf(depth)
             return (-sys.maxsize -1,None)
         elif depth == 0:
+            self.leaf(depth)
+            if self.solve_leaves:
+                won = self.endgame.solve(state,player)
+                if won is not None:
+                    self.proven += 1
+                    return (PROVEN_WIN if won else -PROVEN_WIN,None)
+            self.evaluations += 1
             sommetPlayer = state.endpoints[player]
             assert sommetPlayer is not None
-            return (freeNeighbor(state.G,player,state),None)
+            return (self.cached_evaluate(state,player),None)
 
+        legal_move = self.order_moves(legal_move,state)
+        key = self.position_key(state,player)
+        entry = self._probe(key,depth,legal_move)
+        if entry is not None:
+            if entry.flag == EXACT:
+                return (entry.value,entry.move)
+            elif entry.flag == LOWER:
+                α = max(α,entry.value)
+            else:
+                β = min(β,entry.value)
+            if α >= β:
+                return (entry.value,entry.move)
+
+        α0 = α
         v = -inf
         move = None
-        for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.minValue(nextState,1-player,depth - 1,α,β)
+        for i, a in enumerate(legal_move):
+            apply_move(state,player,a)
+            try:
+                v2,a2 = self.minValue(state,1-player,depth - 1,α,β)
+            finally:
+                undo_move(state,player,a)
             if v2 > v:
                 v = v2
                 move = a
                 if v > α:
                     α = v
             if v >= β:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                self.tt.store(key,depth,v,LOWER,move)
                 return (v,move)
 
+        self.tt.store(key,depth,v,UPPER if v <= α0 else EXACT,move)
         return (v,move)
 
     def minValue(self,state:GameState,player :int, depth:int, α, β)-> tuple[int,Move | None]:
+        self.tick()
         legal_move = get_legal_moves(state,state.G,player)
+
         if not legal_move: 
+            self.leaf(depth)
             return (sys.maxsize,None)
         elif depth == 0:
+            self.leaf(depth)
+            if self.solve_leaves:
+                # player is the opponent of the root player
+                won = self.endgame.solve(state,player)
+                if won is not None:
+                    self.proven += 1
+                    return (-PROVEN_WIN if won else PROVEN_WIN,None)
+            self.evaluations += 1
             sommetPlayer = state.endpoints[1 - player]
             assert sommetPlayer is not None
-            return (freeNeighbor(state.G,1 - player,state),None)
-        
+            return (self.cached_evaluate(state,1 - player),None)
+
+        legal_move = self.order_moves(legal_move,state)
+        key = self.position_key(state,player)
+        entry = self._probe(key,depth,legal_move)
+        if entry is not None:
+            if entry.flag == EXACT:
+                return (entry.value,entry.move)
+            elif entry.flag == LOWER:
+                α = max(α,entry.value)
+            else:
+                β = min(β,entry.value)
+            if α >= β:
+                return (entry.value,entry.move)
+
+        β0 = β
         v = inf
         move = None
-        for a in legal_move:
-            nextState = copy.deepcopy(state)
-            apply_move(nextState,player,a)
-            v2,a2 = self.maxValue(nextState,1-player,depth - 1,α,β)
+        for i, a in enumerate(legal_move):
+            apply_move(state,player,a)
+            try:
+                v2,a2 = self.maxValue(state,1-player,depth - 1,α,β)
+            finally:
+                undo_move(state,player,a)
             if v2 < v:
                 v = v2
                 move = a
@@ -248,45 +665,403 @@ class AlphaBetaStrategyFN(Strategy):
                 if v<β:
                     β = v
             if v <= α:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                self.tt.store(key,depth,v,UPPER,move)
                 return (v,move)
 
+        self.tt.store(key,depth,v,LOWER if v >= β0 else EXACT,move)
         return (v,move)
 
+class AlphaBetaStrategyDFS(AlphaBetaStrategy):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Territories and chambers (see evaluation.py), more accurate than utils.BFS
+        self.evaluator = RegionEvaluator()
+
+    def evaluate(self, state: GameState, player: int) -> int:
+        return self.evaluator(state,player)
+
+    def order_moves(self, moves: List[Move], state: GameState) -> List[Move]:
+        # Trie des moves en fonction du nombre de voisin pour tenter de trier du meilleur au pire coup pour avoir plus de chance d'élaguer
+        moves.sort(key = lambda m: utilMove(m,state,state.G))
+        return moves
+
+class AlphaBetaStrategyFN(AlphaBetaStrategy):
+    def evaluate(self, state: GameState, player: int) -> int:
+        return freeNeighbor(state.G,player,state)
+
 class MCTSNode:
     def __init__(self, state: GameState, parent=None, move= None, player_to_move=0):
         self.state = state
         self.parent = parent
         self.move = move
         self.player_to_move = player_to_move
+        self.depth = 0 if parent is None else parent.depth + 1
         self.children = []
         self.wins = 0
         self.visits = 0
 
         self.untried_moves = get_legal_moves(state, state.G, player_to_move)
 
+
+def moves_between(old: GameState, player: int, state: GameState) -> Optional[List[Move]]:
+    """
+    Moves played from one position to a later one of the same game.
+
+    :param old: (GameState) The earlier position.
+    :param player: (int) The player to move in old.
+    :param state: (GameState) The later position.
+    :return: (Optional[List[Move]]) The moves, alternately of player and of the opponent, or None
+             if state does not follow from old.
+    """
+    if old.G is not state.G:
+        return None
+    # Nodes added to each snake since old, from the endpoint of that time
+    paths = {}
+    for p in (0, 1):
+        before = old.snakes[p]
+        after = state.snakes[p]
+        if len(after) < len(before) or after[:len(before)] != before:
+            return None
+        paths[p] = after[len(before) - 1:]
+    moves = []
+    p = player
+    while len(paths[0]) > 1 or len(paths[1]) > 1:
+        path = paths[p]
+        if len(path) < 2:
+            return None
+        moves.append(Move(path[0], path[1]))
+        paths[p] = path[1:]
+        p = 1 - p
+    return moves
+
 class MonteCarloTreeSearchStrategy(Strategy):
         '''
         Réalisation avec l'aide de Gemini
         '''
+        def __init__(self, iterations: Optional[int] = 1000, workers: int = 0, parallel: str = 'root', leaf_batch: int = 32,
+                     seed: Optional[int] = None, batch_rollouts: int = 0, reuse_tree: bool = True,
+                     max_tree_nodes: int = 200000, time_budget: Optional[float] = None,
+                     max_nodes: Optional[int] = None, early_stop: Optional[str] = None):
+            """
+            The search runs until its number of playouts, its time budget or its node cap is
+            reached (or the early stop criterion holds), whichever comes first. The budget is
+            checked every MCTS_CHECK_EVERY iterations.
+
+            :param iterations: (Optional[int]) Total number of playouts per move, None for no limit.
+            :param workers: (int) Number of worker processes, 0 or 1 to search in this process.
+                            Call close() to stop them.
+            :param parallel: (str) 'root': each worker grows its own tree from the root with its share
+                             of the playouts, and the visit counts of the root moves are summed.
+                             'leaf': a single tree, each expanded node gets leaf_batch playouts
+                             shared between the workers.
+            :param leaf_batch: (int) Number of playouts per expanded node in 'leaf' mode.
+            :param seed: (Optional[int]) Seed of the random generator of the playouts.
+            :param batch_rollouts: (int) If > 0, each expanded node gets this many playouts, run in
+                                   lockstep with NumPy (see batch_rollout.py).
+            :param reuse_tree: (bool) Keep the tree from one move to the next: the search continues
+                               from the subtree of the position reached by our move and the
+                               opponent's, the rest of the tree is dropped. Not in 'root' parallel mode.
+            :param max_tree_nodes: (int) A kept subtree with more nodes than this is dropped as well.
+            :param time_budget: (Optional[float]) Time budget per move in seconds, None for no limit.
+            :param max_nodes: (Optional[int]) Largest number of nodes of the tree (kept subtree
+                              included), None for no limit. In 'root' parallel mode, each worker
+                              gets its share.
+            :param early_stop: (Optional[str]) None to use the whole budget, or 'unreachable': stop
+                               when the most visited root move can no longer be overtaken by
+                               another one in the playouts left (estimated from the playout rate
+                               under a time budget). Not in 'root' parallel mode.
+            """
+            if parallel not in ('root', 'leaf'):
+                raise ValueError(f"Unknown parallel mode: {parallel}")
+            if early_stop not in (None, 'unreachable'):
+                raise ValueError(f"Unknown early stop: {early_stop}")
+            # A node cap alone is not enough: a small game tree can be complete below it
+            if iterations is None and time_budget is None:
+                raise ValueError('An iteration count or a time budget is required')
+            self.iterations = iterations
+            self.time_budget = time_budget
+            self.max_nodes = max_nodes
+            self.early_stop = early_stop
+            self.deadline = None
+            self.search_start = 0.0
+            self.workers = workers
+            self.parallel = parallel
+            self.leaf_batch = leaf_batch
+            self.pool = None
+            self.pool_graph = None
+            self.rnd = random.Random(seed)
+            self.board = None
+            self.board_graph = None
+            self.batch_rollouts = batch_rollouts
+            self.batch_board = None
+            self.batch_board_graph = None
+            self.np_rng = None
+            self.reuse_tree = reuse_tree
+            self.max_tree_nodes = max_tree_nodes
+            # Tree of the previous search (its root), continued at the next move
+            self.tree = None
+            # Statistics of the last search (see instrumentation.SearchStats)
+            self.nodes = 0
+            self.playouts = 0
+            self.max_depth = 0
+            self.reused_visits = 0
+            self.reused_nodes = 0
+            # What ended the last search before its iteration count, if anything
+            self.stopped = None
+
+        def reseed(self, seed: int):
+            """
+            Reset the random generators of the playouts.
+            """
+            self.rnd.seed(seed)
+            self.np_rng = None
+
         def select_move(self, state: GameState, G: Dict[int, Set[int]], player: int) -> Optional[Move]:
-            iter = 1000
-            start = MCTSNode(state=state, parent=None, move=None, player_to_move=player)
+            with self.instrumented(player) as stats:
+                move = self.book_move(state, player, stats)
+                if move is not None:
+                    return move
+                self.deadline = None if self.time_budget is None else time.time() + self.time_budget
+                if self.workers > 1 and self.parallel == 'root':
+                    move = self.select_move_root_parallel(state, player)
+                else:
+                    self.reused_visits = 0
+                    self.reused_nodes = 0
+                    root = self.reused_root(state, player) if self.reuse_tree else None
+                    start = self.search(state, player, self.iterations, root)
+                    # On prend l'enfant avec le plus de visites
+                    children = self.root_children(start, state, player)
+                    move = max(children, key=lambda c: c[1])[0] if children else None
+                    if self.reuse_tree:
+                        self.tree = start
+                stats.move = move
+                stats.reused = self.reused_visits
+                stats.stopped = self.stopped
+                stats.nodes = self.nodes
+                stats.evaluations = self.playouts
+                stats.max_depth = self.max_depth
+            return move
 
-            if not start.untried_moves:
-                return None
-            
-            for _ in range(iter):
+        def search(self, state: GameState, player: int, iterations: Optional[int],
+                   root: Optional[MCTSNode] = None) -> MCTSNode:
+            """
+            Grow a search tree from the given state, within the budget (see out_of_budget()).
+
+            :param state: (GameState) The root state.
+            :param player: (int) The player to move at the root.
+            :param iterations: (Optional[int]) Number of playouts, None for no limit.
+            :param root: (Optional[MCTSNode]) Tree of this position to grow further, see reused_root().
+            :return: (MCTSNode) The root of the tree.
+            """
+            if root is None:
+                start = MCTSNode(state=state, parent=None, move=None, player_to_move=player)
+                self.nodes = 1
+                self.reused_nodes = 0
+            else:
+                start = root
+                self.nodes = 0
+            self.playouts = 0
+            self.max_depth = 0
+            self.stopped = None
+            self.search_start = time.time()
+
+            if not start.untried_moves and not start.children:
+                return start
+
+            leaf_parallel = self.workers > 1 and self.parallel == 'leaf'
+            if leaf_parallel:
+                self.start_pool(state.G)
+
+            playouts = 0
+            iteration = 0
+            while iterations is None or playouts < iterations:
+                iteration += 1
+                if not iteration % MCTS_CHECK_EVERY and self.out_of_budget(start, iterations, playouts):
+                    break
                 node = self.selection(start, player)
                 node = self.expansion(node, player)
-                winner = self.simulation(node.state, node.player_to_move)
-                self.backpropagation(node, winner, player)
+                if node.depth - start.depth > self.max_depth:
+                    self.max_depth = node.depth - start.depth
+                if leaf_parallel and (node.untried_moves or node.children):
+                    n = self.leaf_batch if iterations is None else min(self.leaf_batch, iterations - playouts)
+                    wins0 = self.parallel_simulation(node.state, node.player_to_move, n)
+                    self.backpropagation_batch(node, wins0, n)
+                    playouts += n
+                elif self.batch_rollouts > 0:
+                    n = self.batch_rollouts if iterations is None else min(self.batch_rollouts, iterations - playouts)
+                    wins0 = self.simulation_batch(node.state, node.player_to_move, n)
+                    self.backpropagation_batch(node, wins0, n)
+                    playouts += n
+                else:
+                    winner = self.simulation(node.state, node.player_to_move)
+                    self.backpropagation(node, winner, player)
+                    playouts += 1
+            self.playouts = playouts
+            return start
+
+        def reused_root(self, state: GameState, player: int) -> Optional[MCTSNode]:
+            """
+            Find the given position in the tree of the previous search, by following the moves
+            played since then (ours, then the opponent's). The node found becomes a root: the rest
+            of the previous tree is no longer referenced.
 
-            if not start.children:
+            :param state: (GameState) The current position.
+            :param player: (int) The player to move.
+            :return: (Optional[MCTSNode]) The node of the position, None if the position is not in
+                     the tree (another game, moves that were not expanded) or if the subtree is
+                     larger than max_tree_nodes.
+            """
+            tree, self.tree = self.tree, None
+            moves = moves_between(tree.state, tree.player_to_move, state) if tree is not None else None
+            if moves is None:
                 return None
-            
-            # On prend l'enfant avec le plus de visites 
-            best_child = max(start.children, key=lambda c: c.visits)
-            return best_child.move
+            node = tree
+            for move in moves:
+                node = next((c for c in node.children if c.move == move), None)
+                if node is None:
+                    return None
+            if node.player_to_move != player or node.state.hash != state.hash:
+                return None
+            node.parent = None
+            size = self.subtree_size(node)
+            if size > self.max_tree_nodes:
+                return None
+            self.reused_visits = node.visits
+            self.reused_nodes = size
+            return node
+
+        def out_of_budget(self, root, iterations: Optional[int], playouts: int) -> bool:
+            """
+            Check the time budget, the node cap and the early stop criterion, and record in
+            self.stopped the one that ends the search ('time', 'nodes' or 'early').
+
+            :param root: The root of the tree being grown by search().
+            :param iterations: (Optional[int]) Number of playouts of the search, None for no limit.
+            :param playouts: (int) Number of playouts run so far.
+            :return: (bool) True if the search must stop.
+            """
+            if self.max_nodes is not None and self.tree_size(root) >= self.max_nodes:
+                self.stopped = 'nodes'
+                return True
+            left = None if iterations is None else iterations - playouts
+            if self.deadline is not None:
+                now = time.time()
+                if now >= self.deadline:
+                    self.stopped = 'time'
+                    return True
+                if self.early_stop is not None and now > self.search_start:
+                    # Playouts the time left allows at the rate so far
+                    rate = playouts / (now - self.search_start)
+                    by_time = int(rate * (self.deadline - now))
+                    left = by_time if left is None else min(left, by_time)
+            if self.early_stop == 'unreachable' and left is not None:
+                visits = sorted(self.root_visits(root), reverse=True)
+                if len(visits) == 1 or (len(visits) > 1 and visits[0] - visits[1] > left):
+                    self.stopped = 'early'
+                    return True
+            return False
+
+        def tree_size(self, root: MCTSNode) -> int:
+            """
+            :return: (int) Number of nodes of the tree being grown.
+            """
+            return self.reused_nodes + self.nodes
+
+        def root_visits(self, root: MCTSNode) -> List[int]:
+            """
+            :return: (List[int]) Number of visits of each root move, 0 for the untried ones.
+            """
+            return [child.visits for child in root.children] + [0] * len(root.untried_moves)
+
+        def root_children(self, root: MCTSNode, state: GameState, player: int) -> List[tuple]:
+            """
+            :param root: (MCTSNode) The root of a tree grown by search().
+            :param state: (GameState) The root state.
+            :param player: (int) The player to move at the root.
+            :return: (List[tuple]) (move, visits, wins) for each child of the root.
+            """
+            return [(child.move, child.visits, child.wins) for child in root.children]
+
+        def subtree_size(self, node: MCTSNode) -> int:
+            """
+            :return: (int) Number of nodes of the subtree of node.
+            """
+            count = 0
+            stack = [node]
+            while stack:
+                n = stack.pop()
+                count += 1
+                stack.extend(n.children)
+            return count
+
+        def select_move_root_parallel(self, state: GameState, player: int) -> Optional[Move]:
+            """
+            Root parallelisation: independent trees in the workers, merged at the root.
+            """
+            self.nodes = 0
+            self.playouts = 0
+            self.max_depth = 0
+            self.stopped = None
+            if not get_legal_moves(state, state.G, player):
+                return None
+            self.start_pool(state.G)
+            snakes = {0: list(state.snakes[0]), 1: list(state.snakes[1])}
+            if self.iterations is None:
+                shares = [None] * self.workers
+            else:
+                shares = [self.iterations // self.workers + (1 if i < self.iterations % self.workers else 0)
+                          for i in range(self.workers)]
+            max_nodes = None if self.max_nodes is None else max(1, self.max_nodes // self.workers)
+            futures = [self.pool.submit(mcts_root_task, snakes, player, n, self.rnd.getrandbits(64),
+                                        self.deadline, max_nodes)
+                       for n in shares if n is None or n > 0]
+
+            visits = {}
+            for f in futures:
+                children, nodes, playouts, max_depth, stopped = f.result()
+                self.stopped = self.stopped or stopped
+                for move, v, w in children:
+                    visits[move] = visits.get(move, 0) + v
+                self.nodes += nodes
+                self.playouts += playouts
+                self.max_depth = max(self.max_depth, max_depth)
+            if not visits:
+                return None
+            return max(visits, key=visits.get)
+
+        def parallel_simulation(self, state: GameState, player: int, n: int) -> int:
+            """
+            Leaf parallelisation: run n playouts from the same state in the workers.
+
+            :return: (int) The number of playouts won by player 0.
+            """
+            snakes = {0: list(state.snakes[0]), 1: list(state.snakes[1])}
+            shares = [n // self.workers + (1 if i < n % self.workers else 0) for i in range(self.workers)]
+            futures = [self.pool.submit(rollout_task, snakes, player, k, self.rnd.getrandbits(64))
+                       for k in shares if k > 0]
+            return sum(f.result() for f in futures)
+
+        def start_pool(self, G: Dict[int, Set[int]]):
+            """
+            Start the worker processes, or restart them if the graph changed.
+            """
+            if self.pool is not None and self.pool_graph is G:
+                return
+            self.close()
+            self.pool = make_pool(self.workers, init_mcts_worker, (G, type(self), self.batch_rollouts))
+            self.pool_graph = G
+
+        def close(self):
+            """
+            Stop the worker processes, if any.
+            """
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+                self.pool_graph = None
         
         def selection(self, node: MCTSNode, player: int) -> MCTSNode:
             # tant que enfant et pas de coup non essayé
@@ -316,30 +1091,50 @@ class MonteCarloTreeSearchStrategy(Strategy):
             
             # on choisit un coup non encore essayé
             move = node.untried_moves.pop()
-            new_state = copy.deepcopy(node.state)
+            new_state = node.state.copy()
 
             apply_move(new_state, node.player_to_move, move)
 
             next_player = 1 - node.player_to_move
             child_node = MCTSNode(state=new_state, parent=node, move=move, player_to_move=next_player)
             node.children.append(child_node)
+            self.nodes += 1
             return child_node
 
         
         def simulation(self, state: GameState, player: int) -> int:
-            
-            current_state = copy.deepcopy(state)
-            current_player = player
+            # Random game played on a flat copy of the state, see rollout.py
+            board = self.rollout_board(state.G)
+            return playout(board, board.prepare(state), player, self.rnd)
 
-            while True:
-                legal_moves = get_legal_moves(current_state, current_state.G, current_player)
-                
-                if not legal_moves:
-                    return 1 - current_player  # L'autre joueur a gagné
+        def simulation_batch(self, state: GameState, player: int, n: int) -> int:
+            """
+            Run n playouts from the same state.
+
+            :return: (int) The number of playouts won by player 0.
+            """
+            if self.batch_rollouts > 0:
+                # Imported here so that NumPy is only loaded when it is used
+                from batch_rollout import BatchRolloutBoard
+                if self.batch_board is None or self.batch_board_graph is not state.G:
+                    self.batch_board = BatchRolloutBoard(state.G)
+                    self.batch_board_graph = state.G
+                if self.np_rng is None:
+                    import numpy as np
+                    self.np_rng = np.random.default_rng(self.rnd.getrandbits(64))
+                return self.batch_board.wins(state, player, n, self.np_rng)
+            board = self.rollout_board(state.G)
+            prepared = board.prepare(state)
+            return sum(1 for _ in range(n) if playout(board, prepared, player, self.rnd) == 0)
 
-                move = random.choice(legal_moves)
-                apply_move(current_state, current_player, move)
-                current_player = 1 - current_player
+        def rollout_board(self, G: Dict[int, Set[int]]) -> RolloutBoard:
+            """
+            The flat version of the graph used by the playouts, built once per graph.
+            """
+            if self.board is None or self.board_graph is not G:
+                self.board = RolloutBoard(G)
+                self.board_graph = G
+            return self.board
         
         def backpropagation(self, node: MCTSNode, winner: int, player: int):
             while node is not None:
@@ -352,6 +1147,189 @@ class MonteCarloTreeSearchStrategy(Strategy):
 
                 node = node.parent
 
+        def backpropagation_batch(self, node: MCTSNode, wins0: int, n: int):
+            """
+            Backpropagate the results of n playouts from the same node, wins0 of them won by player 0.
+            """
+            while node is not None:
+                node.visits += n
+
+                player_moved = 1 - node.player_to_move
+
+                node.wins += wins0 if player_moved == 0 else n - wins0
+
+                node = node.parent
+
+class CompactMCTSStrategy(MonteCarloTreeSearchStrategy):
+    """
+    The search of MonteCarloTreeSearchStrategy on a compact tree (see mcts_tree.py): nodes do
+    not hold a copy of their position, which is rebuilt along the path of each iteration, so the
+    tree takes over ten times less memory and searches of millions of nodes fit in memory.
+
+    The positions are rebuilt on the flat board of the playouts (see rollout.py), whose node
+    indices are the nodes of the tree, and the playouts start from it without a copy of the
+    game state. On large graphs this is cheaper than copying a game state per node (1.5 to 2
+    times more playouts per second on a 300-node Erdos-Renyi graph or a d=8 hypercube). On
+    small graphs, where the playouts are short and the paths of the tree long compared with
+    them, rebuilding the positions dominates: on a 30-node Erdos-Renyi graph this strategy runs
+    about 1.4 times fewer playouts per second than MonteCarloTreeSearchStrategy, which remains
+    the better choice there.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Root position of the kept tree and the player to move in it
+        self.tree_state = None
+        self.tree_player = 0
+
+    def search(self, state: GameState, player: int, iterations: Optional[int],
+               root: Optional[MCTSTree] = None) -> MCTSTree:
+        """
+        Grow a search tree from the given state, within the budget (see out_of_budget()).
+
+        :param state: (GameState) The root state, not modified.
+        :param player: (int) The player to move at the root.
+        :param iterations: (Optional[int]) Number of playouts, None for no limit.
+        :param root: (Optional[MCTSTree]) Tree of this position to grow further, see reused_root().
+        :return: (MCTSTree) The tree.
+        """
+        tree = MCTSTree() if root is None else root
+        self.nodes = 1 if root is None else 0
+        self.playouts = 0
+        self.max_depth = 0
+        self.stopped = None
+        self.search_start = time.time()
+        if self.reuse_tree:
+            self.tree_state = state.copy()
+            self.tree_player = player
+
+        leaf_parallel = self.workers > 1 and self.parallel == 'leaf'
+        if leaf_parallel:
+            self.start_pool(state.G)
+
+        # Position of the current node on the flat board, the moves of the path are undone after
+        # each iteration
+        board = self.rollout_board(state.G)
+        occupied, counts, end0, end1 = board.prepare(state)
+        neighbors = board.neighbors
+        ends = [end0, end1]
+        batch = leaf_parallel or self.batch_rollouts > 0
+        # (player, endpoint before the move) for each move of the path
+        path = []
+        playouts = 0
+        iteration = 0
+        while iterations is None or playouts < iterations:
+            iteration += 1
+            if not iteration % MCTS_CHECK_EVERY and self.out_of_budget(tree, iterations, playouts):
+                break
+            node = 0
+            p = player
+            while True:
+                if not tree.expanded(node):
+                    # Same order as MCTSNode.untried_moves, which are popped from the end
+                    moves = legal_moves(board, occupied, counts, ends[p])
+                    moves.reverse()
+                    tree.expand(node, moves)
+                child = tree.try_next(node)
+                if child == NO_NODE:
+                    if tree.num_children[node] == 0:
+                        break
+                    child = tree.best_child(node)
+                v = tree.to_node[child]
+                occupied[v] = 1
+                for u in neighbors[v]:
+                    counts[u] += 1
+                path.append((p, ends[p]))
+                ends[p] = v
+                node = child
+                p = 1 - p
+                if tree.visits[node] == 0:
+                    # Expansion: the new node is simulated
+                    self.nodes += 1
+                    break
+            if len(path) > self.max_depth:
+                self.max_depth = len(path)
+
+            if batch:
+                # The batched playouts start from a game state
+                leaf = self.leaf_state(state, board, path, ends)
+                if leaf_parallel:
+                    n = self.leaf_batch if iterations is None else min(self.leaf_batch, iterations - playouts)
+                    wins0 = self.parallel_simulation(leaf, p, n)
+                else:
+                    n = self.batch_rollouts if iterations is None else min(self.batch_rollouts, iterations - playouts)
+                    wins0 = self.simulation_batch(leaf, p, n)
+            else:
+                n = 1
+                wins0 = 1 if playout(board, (occupied, counts, ends[0], ends[1]), p, self.rnd) == 0 else 0
+            tree.backpropagate(node, wins0, n, 1 - p)
+            playouts += n
+
+            for q, before in reversed(path):
+                v = ends[q]
+                occupied[v] = 0
+                for u in neighbors[v]:
+                    counts[u] -= 1
+                ends[q] = before
+            path.clear()
+        self.playouts = playouts
+        return tree
+
+    def leaf_state(self, state: GameState, board: RolloutBoard, path: List[tuple], ends: List[int]) -> GameState:
+        """
+        :param state: (GameState) The root state.
+        :param board: (RolloutBoard) The flat board of the search.
+        :param path: (List[tuple]) (player, endpoint index before the move) for each move from the root.
+        :param ends: (List[int]) Endpoint indices of the current node.
+        :return: (GameState) The game state of the current node.
+        """
+        leaf = state.copy()
+        nodes = board.nodes
+        # The move of each path entry goes to the endpoint before the next move of the same player
+        after = list(ends)
+        moves = []
+        for q, before in reversed(path):
+            moves.append((q, Move(nodes[before], nodes[after[q]])))
+            after[q] = before
+        for q, move in reversed(moves):
+            apply_move(leaf, q, move)
+        return leaf
+
+    def reused_root(self, state: GameState, player: int) -> Optional[MCTSTree]:
+        """
+        Find the given position in the tree of the previous search, as
+        MonteCarloTreeSearchStrategy.reused_root, and copy its subtree into a new tree.
+
+        :return: (Optional[MCTSTree]) The subtree of the position, None if the position is not
+                 in the tree or if the subtree is larger than max_tree_nodes.
+        """
+        tree, self.tree = self.tree, None
+        old, self.tree_state = self.tree_state, None
+        moves = moves_between(old, self.tree_player, state) if tree is not None else None
+        if moves is None or len(moves) % 2 != (player != self.tree_player):
+            return None
+        index = self.rollout_board(state.G).index
+        node = 0
+        for move in moves:
+            node = tree.child_by_move(node, index[move.to_node])
+            if node == NO_NODE:
+                return None
+        tree = tree.subtree(node, self.max_tree_nodes)
+        if tree is not None:
+            self.reused_visits = tree.visits[0]
+        return tree
+
+    def root_children(self, root: MCTSTree, state: GameState, player: int) -> List[tuple]:
+        start = state.endpoints[player]
+        nodes = self.rollout_board(state.G).nodes
+        return [(Move(start, nodes[i]), visits, wins) for i, visits, wins in root.root_children()]
+
+    def tree_size(self, root: MCTSTree) -> int:
+        return len(root)
+
+    def root_visits(self, root: MCTSTree) -> List[int]:
+        untried = max(root.num_children[0], 0) - root.tried[0]
+        return [visits for _, visits, _ in root.root_children()] + [0] * untried
+
 # Registry of available strategies.
 # Add your new strategies here to run them from main.py.
 STRATEGIES = {
@@ -359,6 +1337,12 @@ STRATEGIES = {
     "greedy": GreedyMaxDegreeStrategy,
     "minmax": MinMaxStrategy,
     "mcts": MonteCarloTreeSearchStrategy,
+    "mcts-compact": CompactMCTSStrategy,
     "alphabetafn": AlphaBetaStrategyFN,
-    "alphabetadfs": AlphaBetaStrategyDFS
+    "alphabetadfs": AlphaBetaStrategyDFS,
+    "alphabetadfs-1s": partial(AlphaBetaStrategyDFS, depth=None, time_budget=1.0),
+    "alphabetafn-1s": partial(AlphaBetaStrategyFN, depth=None, time_budget=1.0),
+    "mcts-1s": partial(MonteCarloTreeSearchStrategy, iterations=None, time_budget=1.0, early_stop='unreachable'),
+    "mcts-compact-1s": partial(CompactMCTSStrategy, iterations=None, time_budget=1.0, early_stop='unreachable'),
+    "alphabetafn-sym": partial(AlphaBetaStrategyFN, symmetric=True)
 }
@@ -0,0 +1,159 @@
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from logic import GameState, Move, SIDE_TO_MOVE_KEY
+
+# Symmetries of the hypercube graphs of utils.hypercube.
+# Every automorphism of the d-dimensional hypercube is x -> perm(x ^ translation), where perm
+# permutes the d bits, so there are 2^d * d! of them. Two positions that are the image of each
+# other by an automorphism have the same value: they can share transposition table entries, and
+# start pairs only differ by the Hamming distance between the two start nodes.
+
+
+class Transform:
+    """
+    Automorphism x -> perm(x ^ translation) of a hypercube.
+    """
+    def __init__(self, translation: int, perm: Tuple[int, ...]):
+        """
+        :param translation: (int) The node mapped to 0.
+        :param perm: (Tuple[int, ...]) perm[i] is the new position of bit i.
+        """
+        self.translation = translation
+        self.perm = perm
+        self.inverse_perm = tuple(sorted(range(len(perm)), key=perm.__getitem__))
+
+    def __call__(self, v: int) -> int:
+        x = v ^ self.translation
+        out = 0
+        for i, b in enumerate(self.perm):
+            if x >> i & 1:
+                out |= 1 << b
+        return out
+
+    def inverse(self, v: int) -> int:
+        """
+        :return: (int) The node mapped to v.
+        """
+        out = 0
+        for i, b in enumerate(self.inverse_perm):
+            if v >> i & 1:
+                out |= 1 << b
+        return out ^ self.translation
+
+    def map_move(self, move: Move) -> Move:
+        return Move(self(move.from_node), self(move.to_node))
+
+    def unmap_move(self, move: Move) -> Move:
+        """
+        Map a move of the canonical position back to the original position.
+        """
+        return Move(self.inverse(move.from_node), self.inverse(move.to_node))
+
+    def __repr__(self) -> str:
+        return f"Transform(translation={self.translation}, perm={self.perm})"
+
+
+def hypercube_dimension(G) -> Optional[int]:
+    """
+    Recognize the hypercubes built by utils.hypercube (node v adjacent to v ^ 2^i for each bit i).
+
+    :param G: (Dict[int, Set[int]]) Adjacency dictionary representing the graph.
+    :return: (Optional[int]) The dimension, or None if G is not such a hypercube.
+    """
+    n = len(G)
+    d = n.bit_length() - 1
+    if n == 0 or n != 1 << d:
+        return None
+    for v in range(n):
+        if v not in G or len(G[v]) != d:
+            return None
+        for i in range(d):
+            if v ^ (1 << i) not in G[v]:
+                return None
+    return d
+
+
+def canonical_transform(snakes: Dict[int, List[int]], d: int) -> Transform:
+    """
+    Automorphism giving the canonical form of a position: the start node of player 0 is mapped to 0,
+    and the bits are renumbered in the order in which the snakes first use them (moves of player
+    0, then moves of player 1, then the bits of the start node of player 1, then the unused ones).
+    Two positions that are the image of each other by an automorphism (snakes included, in the
+    order in which they were played) have the same canonical form.
+
+    :param snakes: (Dict[int, List[int]]) The snakes, from head to endpoint.
+    :param d: (int) Dimension of the hypercube.
+    :return: (Transform) The automorphism to the canonical form.
+    """
+    translation = snakes[0][0]
+    order = []
+    seen = 0
+    for player in (0, 1):
+        snake = snakes[player]
+        for i in range(1, len(snake)):
+            bit = (snake[i] ^ snake[i - 1]).bit_length() - 1
+            if not seen >> bit & 1:
+                seen |= 1 << bit
+                order.append(bit)
+    head1 = snakes[1][0] ^ translation if snakes[1] else 0
+    # Bits that are not used by any move can only be told apart by the start node of player 1
+    order.extend(i for i in range(d) if not seen >> i & 1 and head1 >> i & 1)
+    order.extend(i for i in range(d) if not seen >> i & 1 and not head1 >> i & 1)
+    perm = [0] * d
+    for new, old in enumerate(order):
+        perm[old] = new
+    return Transform(translation, tuple(perm))
+
+
+def canonicalize(snakes: Dict[int, List[int]], d: int) -> Tuple[Dict[int, List[int]], Transform]:
+    """
+    Canonical form of a position, see canonical_transform.
+
+    :param snakes: (Dict[int, List[int]]) The snakes, from head to endpoint.
+    :param d: (int) Dimension of the hypercube.
+    :return: (Tuple[Dict[int, List[int]], Transform]) The snakes of the canonical position, and the
+             transform, whose unmap_move() maps moves of the canonical position back.
+    """
+    t = canonical_transform(snakes, d)
+    return {p: [t(v) for v in snakes[p]] for p in (0, 1)}, t
+
+
+def canonical_key(state: GameState, player: int, d: int, t: Optional[Transform] = None) -> int:
+    """
+    Zobrist hash (see GameState.key) of the canonical form of a position, the same for all the
+    positions that are the image of each other by an automorphism. It costs O(d) per occupied
+    node, against O(1) for GameState.key.
+
+    :param state: (GameState) The game state, on a hypercube.
+    :param player: (int) The ID of the player to move, 0 or 1.
+    :param d: (int) Dimension of the hypercube.
+    :param t: (Optional[Transform]) canonical_transform of the position, if already known.
+    :return: (int) A 64-bit hash.
+    """
+    if t is None:
+        t = canonical_transform(state.snakes, d)
+    keys = state.zobrist_occupied
+    h = state.zobrist_endpoint[0][t(state.endpoints[0])] ^ state.zobrist_endpoint[1][t(state.endpoints[1])]
+    for v in state.occupied:
+        h ^= keys[t(v)]
+    return h ^ SIDE_TO_MOVE_KEY if player else h
+
+
+def distinct_start_pairs(d: int) -> List[Tuple[Tuple[int, int], int]]:
+    """
+    Start pairs of the d-dimensional hypercube up to symmetry: a pair is equivalent to
+    (0, 2^k - 1), where k is the Hamming distance between the two nodes.
+
+    :param d: (int) Dimension of the hypercube.
+    :return: (List[Tuple[Tuple[int, int], int]]) For k = 1..d, the pair (0, 2^k - 1) and the number
+             of ordered start pairs it stands for (2^d * C(d, k)), for weighted averages.
+    """
+    return [((0, (1 << k) - 1), (1 << d) * comb(d, k)) for k in range(1, d + 1)]
+
+
+def start_pair_distance(a: int, b: int) -> int:
+    """
+    :return: (int) Hamming distance between two nodes, which identifies their start pair up to symmetry.
+    """
+    return bin(a ^ b).count("1")
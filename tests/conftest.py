@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The modules of the project are at the root of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph import freeze_graph
+from logic import GameState, apply_move, get_legal_moves
+from utils import hypercube, pick_random_start, random_erdos_renyi
+
+
+def play_random_games(G, games: int, seed: int):
+    """
+    Positions along seeded random games on a graph.
+
+    :return: (List[Tuple[GameState, int, List[Move]]]) Every position of the games with the
+             player to move and the moves played to reach it, the last one of each game included.
+    """
+    G = freeze_graph(G)
+    positions = []
+    for i in range(games):
+        rnd = random.Random(seed * 1000 + i)
+        state = GameState(G.keys(), G)
+        state.init_snakes(*pick_random_start(G, seed=seed * 1000 + i))
+        moves = []
+        player = 0
+        while True:
+            positions.append((state.copy(), player, list(moves)))
+            legal = get_legal_moves(state, G, player)
+            if not legal:
+                break
+            move = rnd.choice(legal)
+            apply_move(state, player, move)
+            moves.append(move)
+            player = 1 - player
+    return positions
+
+
+@pytest.fixture(scope="session")
+def random_games():
+    """
+    play_random_games, for the tests that need games on their own graphs.
+    """
+    return play_random_games
+
+
+@pytest.fixture(scope="session")
+def small_graphs():
+    """
+    Graphs small enough to be solved by brute force, by name.
+    """
+    return {"cube-d3": hypercube(3), "cube-d4": hypercube(4),
+            "erdos-n10": random_erdos_renyi(10, 0.35, seed=1), "erdos-n12": random_erdos_renyi(12, 0.3, seed=2)}
+
+
+@pytest.fixture(scope="session")
+def positions(small_graphs):
+    """
+    Positions of random games on each of the small graphs, see play_random_games.
+    """
+    return {name: play_random_games(G, 8, seed) for seed, (name, G) in enumerate(small_graphs.items())}
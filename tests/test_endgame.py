@@ -0,0 +1,51 @@
+from endgame import EndgameSolver
+from logic import apply_move, get_legal_moves, undo_move
+
+
+def minimax_wins(state, player) -> bool:
+    """
+    Whether the player to move wins with perfect play, by brute force: a player without a legal
+    move loses.
+    """
+    for m in get_legal_moves(state, state.G, player):
+        apply_move(state, player, m)
+        try:
+            lost = not minimax_wins(state, 1 - player)
+        finally:
+            undo_move(state, player, m)
+        if lost:
+            return True
+    return False
+
+
+def test_solve_matches_minimax(positions):
+    solver = EndgameSolver(max_region=16, max_nodes=10 ** 6)
+    solved = 0
+    for name, games in positions.items():
+        for state, player, _ in games:
+            result = solver.solve(state, player)
+            assert result is not None, name
+            assert result == minimax_wins(state, player), name
+            solved += 1
+    assert solved > 100
+
+
+def test_best_move_wins(positions):
+    solver = EndgameSolver(max_region=16, max_nodes=10 ** 6)
+    for games in positions.values():
+        for state, player, _ in games:
+            won, move = solver.best_move(state, player)
+            assert won == minimax_wins(state, player)
+            if won:
+                assert move in get_legal_moves(state, state.G, player)
+                apply_move(state, player, move)
+                assert not minimax_wins(state, 1 - player)
+                undo_move(state, player, move)
+            else:
+                assert move is None
+
+
+def test_large_regions_are_not_solved(positions):
+    solver = EndgameSolver(max_region=4)
+    state, player, _ = positions["cube-d4"][0]
+    assert solver.solve(state, player) is None
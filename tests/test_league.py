@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from league import SPRT, Pairing, pairing_games, wilson_interval
+from tournament import GraphSpec
+
+
+def test_long_pairings_do_not_replay_games():
+    # 2 families x 20 seeds: 80 distinct games, fewer than the 100 of --max-games
+    specs = [GraphSpec('cube', d=5), GraphSpec('erdos')]
+    games = pairing_games(Pairing('a', 'b'), specs, list(range(20)), 0, 100)
+    assert len(games) == 100
+    assert len(set(games)) == 100
+    # Both games of a pair have the same graph and start nodes, with the colours swapped
+    for first, second in zip(games[::2], games[1::2]):
+        assert first[2:4] == second[2:4]
+        assert first[:2] == second[1::-1]
+        assert first[4] == second[4][::-1]
+
+
+def test_pairing_games_can_be_generated_in_batches():
+    specs = [GraphSpec('cube', d=4)]
+    seeds = [0, 1, 2]
+    pairing = Pairing('a', 'b')
+    games = pairing_games(pairing, specs, seeds, 0, 10)
+    assert games == pairing_games(pairing, specs, seeds, 0, 4) + pairing_games(pairing, specs, seeds, 4, 6)
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(5, 10)
+    assert low == pytest.approx(0.2366, abs=1e-4)
+    assert high == pytest.approx(0.7634, abs=1e-4)
+    low, high = wilson_interval(10, 10)
+    assert low == pytest.approx(0.7225, abs=1e-4)
+    assert high == 1.0
+    low, high = wilson_interval(0, 10)
+    assert low == 0.0
+    assert high == pytest.approx(0.2775, abs=1e-4)
+    # 99 % interval, wider
+    assert wilson_interval(5, 10, z=2.576)[0] < 0.2366
+
+
+def test_sprt_thresholds():
+    sprt = SPRT(delta=0.1, alpha=0.05, beta=0.05)
+    # Each win adds log(0.6 / 0.4), each loss removes as much; the bounds are +/- log(19)
+    assert sprt.upper == pytest.approx(math.log(19))
+    assert sprt.lower == pytest.approx(-math.log(19))
+    assert sprt.llr(3, 1) == pytest.approx(2 * math.log(1.5))
+    assert sprt.decision(7, 0) is None
+    assert sprt.decision(8, 0) == 1
+    assert sprt.decision(0, 8) == -1
+    assert sprt.decision(11, 4) is None
+    assert sprt.decision(12, 4) == 1
+    assert sprt.decision(50, 50) is None
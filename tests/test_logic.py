@@ -0,0 +1,98 @@
+import copy
+import pickle
+
+import pytest
+
+from logic import (GameState, Move, _check_induced_path_property, apply_move, get_candidate_moves, get_legal_moves,
+                   is_move_legal, undo_move)
+
+
+def replayed(G, start, moves):
+    """
+    A new state with the moves played from the start nodes.
+    """
+    state = GameState(G.keys(), G)
+    state.init_snakes(*start)
+    for i, m in enumerate(moves):
+        apply_move(state, i % 2, m)
+    return state
+
+
+def test_is_move_legal_matches_the_rules(positions):
+    checked = 0
+    for name, games in positions.items():
+        for state, player, _ in games:
+            G = state.G
+            end = state.endpoints[player]
+            # All the nodes, not only the neighbours of the endpoint, and moves from the wrong node
+            for v in G:
+                for frm in (end, state.endpoints[1 - player]):
+                    expected = (frm == end and v not in state.occupied and v in G[frm]
+                                and _check_induced_path_property(state.occupied | {v}, G))
+                    assert is_move_legal(state, player, Move(frm, v)) == expected, (name, frm, v)
+                    checked += 1
+    assert checked > 1000
+
+
+def test_get_legal_moves_filters_the_candidates(positions):
+    for games in positions.values():
+        for state, player, _ in games:
+            legal = get_legal_moves(state, state.G, player)
+            assert legal == [m for m in get_candidate_moves(state, state.G, player) if is_move_legal(state, player, m)]
+
+
+def test_apply_undo_round_trip(positions):
+    for games in positions.values():
+        for state, player, moves in games:
+            before = state.copy()
+            for m in get_legal_moves(state, state.G, player):
+                apply_move(state, player, m)
+                # The incremental hash and counts are those of the same position built from scratch
+                fresh = replayed(state.G, (state.snakes[0][0], state.snakes[1][0]), moves + [m])
+                assert state.hash == fresh.hash
+                assert state.occupied_neighbors == fresh.occupied_neighbors
+                undo_move(state, player, m)
+                assert state.hash == before.hash
+                assert state.occupied == before.occupied
+                assert state.occupied_neighbors == before.occupied_neighbors
+                assert state.snakes == before.snakes
+                assert state.endpoints == before.endpoints
+
+
+def test_keys_tell_the_player_to_move_apart(positions):
+    for games in positions.values():
+        for state, _, _ in games:
+            assert state.key(0) != state.key(1)
+            assert state.key(0) == state.hash
+
+
+def test_copy_is_independent(positions):
+    state, player, _ = positions["cube-d4"][0]
+    other = state.copy()
+    m = get_legal_moves(other, other.G, player)[0]
+    apply_move(other, player, m)
+    assert m.to_node not in state.occupied
+    assert state.hash != other.hash
+    assert len(state.snakes[player]) + 1 == len(other.snakes[player])
+
+
+def test_zobrist_tables_are_read_only(small_graphs):
+    # Dense nodes (arrays) and other node numbers (dicts)
+    graphs = [small_graphs["cube-d3"], {v + 100: {u + 100 for u in nbrs} for v, nbrs in small_graphs["cube-d3"].items()}]
+    for G in graphs:
+        state = GameState(G.keys(), G)
+        v = next(iter(G))
+        for table in (state.zobrist_occupied, state.zobrist_endpoint[0], state.zobrist_endpoint[1]):
+            with pytest.raises(TypeError):
+                table[v] = 0
+
+
+def test_states_can_be_deep_copied_and_pickled(positions):
+    state, player, _ = next(p for p in positions["cube-d4"][1:] if get_legal_moves(p[0], p[0].G, p[1]))
+    for other in (copy.deepcopy(state), pickle.loads(pickle.dumps(state))):
+        assert other.hash == state.hash
+        assert other.snakes == state.snakes
+        assert other.occupied_neighbors == state.occupied_neighbors
+        m = get_legal_moves(other, other.G, player)[0]
+        apply_move(other, player, m)
+        assert m.to_node not in state.occupied
@@ -0,0 +1,36 @@
+from graph import freeze_graph
+from logic import GameState, apply_move, get_legal_moves
+from rollout import RolloutBoard, legal_moves
+
+
+def check_legal_moves(games):
+    boards = {}
+    for state, player, _ in games:
+        board = boards.setdefault(id(state.G), RolloutBoard(state.G))
+        occupied, counts, e0, e1 = board.prepare(state)
+        e = (e0, e1)[player]
+        moves = [board.nodes[v] for v in legal_moves(board, occupied, counts, e)]
+        assert moves == [m.to_node for m in get_legal_moves(state, state.G, player)]
+
+
+def test_legal_moves_match_get_legal_moves(positions):
+    for games in positions.values():
+        check_legal_moves(games)
+
+
+def test_legal_moves_with_other_node_numbers(small_graphs, random_games):
+    # Nodes that are not 0..n-1 are numbered by the board
+    G = {10 * v + 7: {10 * u + 7 for u in nbrs} for v, nbrs in small_graphs["erdos-n12"].items()}
+    check_legal_moves(random_games(G, 8, 5))
+
+
+def test_prepare_tracks_the_state(small_graphs):
+    G = freeze_graph(small_graphs["cube-d3"])
+    board = RolloutBoard(G)
+    state = GameState(G.keys(), G)
+    state.init_snakes(0, 7)
+    apply_move(state, 0, get_legal_moves(state, G, 0)[0])
+    occupied, counts, e0, e1 = board.prepare(state)
+    assert {board.nodes[i] for i in range(board.n) if occupied[i]} == state.occupied
+    assert {board.nodes[i]: c for i, c in enumerate(counts) if c} == state.occupied_neighbors
+    assert (board.nodes[e0], board.nodes[e1]) == (state.endpoints[0], state.endpoints[1])
@@ -0,0 +1,45 @@
+from game import Game
+from strategy import AlphaBetaStrategyFN
+from utils import hypercube
+
+
+def first_move_hits(strategy):
+    """
+    Transposition table and evaluation cache hits of the first move of a game on a new copy of
+    the 4-cube.
+    """
+    # Each game freezes its own copy of the graph, as in main.py
+    game = Game(hypercube(4), 0, 15)
+    tt_hits, eval_hits = strategy.tt.hits, strategy.eval_cache.hits
+    strategy.select_move(game.state.copy(), game.G, 0)
+    return strategy.tt.hits - tt_hits, strategy.eval_cache.hits - eval_hits
+
+
+def test_caches_survive_a_new_game_on_the_same_cube():
+    cold = first_move_hits(AlphaBetaStrategyFN(depth=3, endgame=0))
+
+    strategy = AlphaBetaStrategyFN(depth=3, endgame=0)
+    game = Game(hypercube(4), 0, 15)
+    game.play_game(strategy, AlphaBetaStrategyFN(depth=2))
+    size = len(strategy.eval_cache)
+    assert size > 0
+    warm = first_move_hits(strategy)
+    assert len(strategy.eval_cache) >= size
+    assert warm[0] > cold[0]
+    assert warm[1] > cold[1]
+
+
+def test_caches_are_cleared_on_another_graph():
+    strategy = AlphaBetaStrategyFN(depth=3, endgame=4)
+    game = Game(hypercube(4), 0, 15)
+    game.play_game(strategy, AlphaBetaStrategyFN(depth=2))
+    assert len(strategy.eval_cache) > 0
+    assert strategy.endgame.cache
+
+    # Same nodes, one edge less: the keys would be the same, the values are not
+    G = {v: set(hypercube(4)[v]) for v in range(16)}
+    G[0].discard(1)
+    G[1].discard(0)
+    strategy.set_graph(Game(G, 0, 15).G)
+    assert len(strategy.eval_cache) == 0
+    assert not strategy.endgame.cache
@@ -0,0 +1,66 @@
+import itertools
+import random
+
+from logic import GameState, Move, apply_move, get_legal_moves
+from symmetry import Transform, canonical_key, canonicalize, hypercube_dimension
+from utils import hypercube
+
+
+def mapped(state, t):
+    """
+    The image of a position by an automorphism of the hypercube, the moves played in the same order.
+    """
+    image = GameState(state.G.keys(), state.G)
+    image.init_snakes(t(state.snakes[0][0]), t(state.snakes[1][0]))
+    for i in range(1, max(len(state.snakes[0]), len(state.snakes[1]))):
+        for p in (0, 1):
+            if i < len(state.snakes[p]):
+                apply_move(image, p, t.map_move(Move(state.snakes[p][i - 1], state.snakes[p][i])))
+    return image
+
+
+def automorphisms(d, count, seed):
+    rnd = random.Random(seed)
+    perms = list(itertools.permutations(range(d)))
+    return [Transform(rnd.randrange(1 << d), rnd.choice(perms)) for _ in range(count)]
+
+
+def test_transforms_are_automorphisms():
+    G = hypercube(4)
+    for t in automorphisms(4, 20, 0):
+        assert sorted(t(v) for v in G) == list(range(16))
+        for v in G:
+            assert t.inverse(t(v)) == v
+            assert {t(u) for u in G[v]} == set(G[t(v)])
+
+
+def test_canonical_key_is_invariant(positions):
+    for name, d in (("cube-d3", 3), ("cube-d4", 4)):
+        transforms = automorphisms(d, 10, d)
+        for state, player, _ in positions[name]:
+            key = canonical_key(state, player, d)
+            for t in transforms:
+                image = mapped(state, t)
+                assert image.occupied == {t(v) for v in state.occupied}
+                assert canonical_key(image, player, d) == key
+                assert canonicalize(image.snakes, d)[0] == canonicalize(state.snakes, d)[0]
+
+
+def test_canonical_key_tells_positions_apart(positions):
+    # Different positions on the same nodes, up to symmetry, have different canonical forms
+    for state, player, _ in positions["cube-d4"]:
+        keys = set()
+        forms = set()
+        for m in get_legal_moves(state, state.G, player):
+            child = state.copy()
+            apply_move(child, player, m)
+            keys.add(canonical_key(child, 1 - player, 4))
+            snakes, _ = canonicalize(child.snakes, 4)
+            forms.add((tuple(snakes[0]), tuple(snakes[1])))
+        assert len(keys) == len(forms)
+
+
+def test_hypercube_dimension(small_graphs):
+    assert hypercube_dimension(small_graphs["cube-d3"]) == 3
+    assert hypercube_dimension(small_graphs["cube-d4"]) == 4
+    assert hypercube_dimension(small_graphs["erdos-n12"]) is None
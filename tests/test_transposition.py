@@ -0,0 +1,99 @@
+import itertools
+import sys
+from math import inf
+
+from logic import Move, apply_move, get_legal_moves, undo_move
+from strategy import AlphaBetaStrategyDFS, AlphaBetaStrategyFN
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+def minimax(strategy, state, player, depth):
+    """
+    Plain minimax with the leaf values of AlphaBetaStrategy, seen from its root player.
+    """
+    root = strategy.root_player
+    legal = get_legal_moves(state, state.G, player)
+    if not legal:
+        return -sys.maxsize - 1 if player == root else sys.maxsize
+    if depth == 0:
+        return strategy.evaluate(state, root)
+    values = []
+    for m in legal:
+        apply_move(state, player, m)
+        values.append(minimax(strategy, state, 1 - player, depth - 1))
+        undo_move(state, player, m)
+    return max(values) if player == root else min(values)
+
+
+def test_replacement_policy():
+    tt = TranspositionTable(16)
+    tt.new_search()
+    tt.store(5, 3, 10, EXACT, Move(0, 1))
+    # A shallower result of the same search does not replace a deeper one
+    tt.store(5, 2, 20, LOWER, None)
+    assert tt.probe(5).value == 10
+    # Another key in the same slot is not returned
+    assert tt.probe(5 + 16) is None
+    tt.store(5, 3, 30, UPPER, None)
+    assert tt.probe(5)[2:4] == (30, UPPER)
+    # Entries of older searches are always replaceable
+    tt.new_search()
+    tt.store(5 + 16, 1, 40, EXACT, None)
+    assert tt.probe(5) is None
+    assert tt.probe(5 + 16).value == 40
+    tt.clear()
+    assert tt.probe(5 + 16) is None
+
+
+def check_window(value, exact, alpha, beta):
+    """
+    Fail-soft alpha-beta: the value is exact inside the window, a bound of the exact value outside.
+    """
+    if value <= alpha:
+        assert exact <= value
+    elif value >= beta:
+        assert exact >= value
+    else:
+        assert exact == value
+
+
+def test_search_values_match_minimax(positions):
+    # The same positions are searched with many windows and one table, which then returns stored
+    # bounds: they must never give a wrong value
+    for cls in (AlphaBetaStrategyFN, AlphaBetaStrategyDFS):
+        strategy = cls(depth=3, endgame=0, eval_cache=0)
+        for name in ("cube-d4", "erdos-n12"):
+            for state, player, _ in positions[name]:
+                strategy.set_graph(state.G)
+                strategy.tt.new_search()
+                # Positions searched from both sides: maxValue at the root player's turn, else minValue
+                for root in (player, 1 - player):
+                    strategy.root_player = root
+                    search = strategy.maxValue if root == player else strategy.minValue
+                    for depth in (1, 2, 3):
+                        exact = minimax(strategy, state, player, depth)
+                        if abs(exact) >= sys.maxsize:
+                            continue
+                        bounds = [-inf] + [exact + k for k in (-10, -3, -1, 0, 1, 3, 10)] + [inf]
+                        for alpha, beta in itertools.combinations(bounds, 2):
+                            value, _ = search(state, player, depth, alpha, beta)
+                            check_window(value, exact, alpha, beta)
+                        assert search(state, player, depth, -inf, inf)[0] == exact
+        assert strategy.tt.hits > 0
+
+
+def test_root_search_matches_minimax(positions):
+    # Iterative deepening with the table kept from one position to the next, as in a game
+    strategy = AlphaBetaStrategyFN(depth=3, endgame=0, eval_cache=0)
+    for state, player, _ in positions["cube-d4"]:
+        legal = get_legal_moves(state, state.G, player)
+        if not legal:
+            continue
+        strategy.set_graph(state.G)
+        strategy.tt.new_search()
+        strategy.root_player = player
+        move = strategy.order_moves(legal, state)[0]
+        for depth in (1, 2, 3):
+            value, move = strategy.search_root(state, player, depth, move)
+            assert value == minimax(strategy, state, player, depth)
+            assert move in legal
@@ -0,0 +1,288 @@
+import argparse
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from game import Game
+from graph import freeze_graph
+from strategy import STRATEGIES
+from symmetry import distinct_start_pairs, start_pair_distance
+from utils import random_erdos_renyi, hypercube, pick_random_start
+
+# Play many games in a single process (or a process pool), without going through main.py.
+
+
+@dataclass
+class GameRecord:
+    """
+    Result of one game.
+    """
+    strategies: Tuple[str, str]      # strategy of player 0, strategy of player 1
+    graph: str                       # graph description, e.g. 'cube-d5' or 'erdos-n30-p0.08-s3'
+    seed: Optional[int]              # seed of the graph (Erdos-Renyi) and of the start positions
+    start: Tuple[int, int]           # start nodes of player 0 and player 1
+    winner: int                      # 0 or 1
+    moves: int                       # number of moves played
+    move_times: List[float] = field(default_factory=list)  # select_move time of each move, in seconds
+    duration: float = 0.0            # duration of the whole game, in seconds
+
+    @property
+    def winner_strategy(self) -> str:
+        return self.strategies[self.winner]
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    """
+    Parameters of a graph family, as in main.py.
+    """
+    kind: str = "cube"   # 'cube' or 'erdos'
+    d: int = 5           # dimension (hypercube)
+    n: int = 30          # number of nodes (Erdos-Renyi)
+    p: float = 0.08      # edge probability (Erdos-Renyi)
+
+    def name(self, seed: Optional[int]) -> str:
+        if self.kind == "cube":
+            return f"cube-d{self.d}"
+        return f"erdos-n{self.n}-p{self.p}-s{seed}"
+
+
+def make_graph(spec: GraphSpec, seed: Optional[int]):
+    """
+    Build (and cache) the frozen graph of a family. Hypercubes do not depend on the seed: all
+    their games get the same graph object, so that the strategies keep their caches.
+
+    :param spec: (GraphSpec) The graph family.
+    :param seed: (Optional[int]) Seed of the Erdos-Renyi graph.
+    :return: (FrozenGraph) The graph.
+    """
+    return _build_graph(spec, seed if spec.kind == "erdos" else None)
+
+
+@lru_cache(maxsize=16)
+def _build_graph(spec: GraphSpec, seed: Optional[int]):
+    if spec.kind == "cube":
+        return freeze_graph(hypercube(spec.d))
+    elif spec.kind == "erdos":
+        return freeze_graph(random_erdos_renyi(spec.n, spec.p, seed=seed))
+    raise ValueError(f"Unknown graph type: {spec.kind}")
+
+
+# Strategy instances are reused between games of the same process, so that their caches survive.
+# There is one instance per player so that a strategy playing against itself has two.
+_instances: Dict[Tuple[str, int], object] = {}
+
+
+def get_strategy(name: str, player: int):
+    """
+    :param name: (str) Name of a strategy in STRATEGIES.
+    :param player: (int) The player it plays, 0 or 1.
+    :return: (Strategy) The instance of this strategy for this player in the current process.
+    """
+    if (name, player) not in _instances:
+        _instances[(name, player)] = STRATEGIES[name]()
+    return _instances[(name, player)]
+
+
+def play_one(s0: str, s1: str, spec: GraphSpec, seed: Optional[int], start: Optional[Tuple[int, int]] = None,
+             quiet: bool = True) -> GameRecord:
+    """
+    Play one game.
+
+    :param s0: (str) Strategy of player 0.
+    :param s1: (str) Strategy of player 1.
+    :param spec: (GraphSpec) The graph family.
+    :param seed: (Optional[int]) Seed of the graph and of the start positions.
+    :param start: (Optional[Tuple[int, int]]) Start nodes, picked with pick_random_start if None.
+    :param quiet: (bool) Hide what the strategies print.
+    :return: (GameRecord) The result.
+    """
+    G = make_graph(spec, seed)
+    a, b = start if start is not None else pick_random_start(G, seed=seed)
+    game = Game(G, a, b)
+    begin = time.perf_counter()
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with output:
+        winner = game.play_game(get_strategy(s0, 0), get_strategy(s1, 1))
+    return GameRecord(strategies=(s0, s1), graph=spec.name(seed), seed=seed, start=(a, b), winner=winner,
+                      moves=len(game.history), move_times=game.move_times,
+                      duration=time.perf_counter() - begin)
+
+
+def _play_task(args) -> GameRecord:
+    return play_one(*args)
+
+
+def schedule(s0: str, s1: str, games: int, spec: GraphSpec, seed: int = 0,
+             swap_colours: bool = True) -> List[tuple]:
+    """
+    List the games of a match. With swap_colours, games go by pairs on the same graph and start
+    nodes, each strategy playing first once.
+
+    :return: (List[tuple]) Arguments of play_one for each game.
+    """
+    tasks = []
+    for i in range(games):
+        if swap_colours:
+            game_seed = seed + i // 2
+            players = (s0, s1) if i % 2 == 0 else (s1, s0)
+        else:
+            game_seed = seed + i
+            players = (s0, s1)
+        start = None
+        if swap_colours and i % 2 == 1:
+            # Same start nodes as the previous game, seen from the other side
+            G = make_graph(spec, game_seed)
+            a, b = pick_random_start(G, seed=game_seed)
+            start = (b, a)
+        tasks.append((players[0], players[1], spec, game_seed, start))
+    return tasks
+
+
+def schedule_distinct_starts(s0: str, s1: str, spec: GraphSpec, swap_colours: bool = True) -> List[tuple]:
+    """
+    List the games of a match on a hypercube with one game per start pair up to symmetry
+    (see symmetry.distinct_start_pairs), instead of random start pairs. With swap_colours, each
+    start pair is played twice, each strategy playing first once.
+
+    :return: (List[tuple]) Arguments of play_one for each game.
+    """
+    if spec.kind != "cube":
+        raise ValueError("Distinct start pairs are only known for hypercubes")
+    tasks = []
+    for (a, b), _ in distinct_start_pairs(spec.d):
+        tasks.append((s0, s1, spec, None, (a, b)))
+        if swap_colours:
+            tasks.append((s1, s0, spec, None, (b, a)))
+    return tasks
+
+
+def run_games(tasks: List[tuple], workers: int = 0) -> List[GameRecord]:
+    """
+    Play a list of games, in this process or in a process pool.
+
+    :param tasks: (List[tuple]) Arguments of play_one for each game, see schedule().
+    :param workers: (int) Number of worker processes, 0 or 1 to play in this process.
+    :return: (List[GameRecord]) The results, in the order of the tasks.
+    """
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_play_task, tasks))
+    return [_play_task(t) for t in tasks]
+
+
+def run_tournament(s0: str, s1: str, games: int = 10, spec: GraphSpec = GraphSpec(), seed: int = 0,
+                   swap_colours: bool = True, workers: int = 0) -> List[GameRecord]:
+    """
+    Play a match between two strategies.
+
+    :param s0: (str) First strategy.
+    :param s1: (str) Second strategy.
+    :param games: (int) Number of games.
+    :param spec: (GraphSpec) The graph family.
+    :param seed: (int) Seed of the first game, the following games use the next seeds.
+    :param swap_colours: (bool) Alternate which strategy plays first, see schedule().
+    :param workers: (int) Number of worker processes, 0 or 1 to play in this process.
+    :return: (List[GameRecord]) The results.
+    """
+    return run_games(schedule(s0, s1, games, spec, seed, swap_colours), workers)
+
+
+def summarize(records: List[GameRecord]) -> Dict[str, dict]:
+    """
+    Aggregate results per strategy: wins, wins as first player and average move time.
+
+    :param records: (List[GameRecord]) The results.
+    :return: (Dict[str, dict]) Statistics per strategy name.
+    """
+    stats: Dict[str, dict] = {}
+    for r in records:
+        for player, name in enumerate(r.strategies):
+            s = stats.setdefault(name, {"games": 0, "wins": 0, "games_first": 0, "wins_first": 0,
+                                        "moves": 0, "time": 0.0})
+            s["games"] += 1
+            s["wins"] += r.winner == player
+            if player == 0:
+                s["games_first"] += 1
+                s["wins_first"] += r.winner == 0
+            # Moves of this player are the even (player 0) or odd (player 1) entries
+            times = r.move_times[player::2]
+            s["moves"] += len(times)
+            s["time"] += sum(times)
+    for s in stats.values():
+        s["winrate"] = s["wins"] / s["games"]
+        s["avg_move_time"] = s["time"] / s["moves"] if s["moves"] else 0.0
+    return stats
+
+
+def weighted_winrates(records: List[GameRecord], d: int) -> Dict[str, float]:
+    """
+    Win rate of each strategy when each game stands for all the start pairs equivalent to its own,
+    that is the expected win rate over uniformly random start pairs (see schedule_distinct_starts).
+
+    :param records: (List[GameRecord]) The results, on the d-dimensional hypercube.
+    :param d: (int) Dimension of the hypercube.
+    :return: (Dict[str, float]) Weighted win rate per strategy name.
+    """
+    won: Dict[str, float] = {}
+    total: Dict[str, float] = {}
+    for r in records:
+        weight = comb(d, start_pair_distance(*r.start))
+        for name in r.strategies:
+            total[name] = total.get(name, 0) + weight
+            won[name] = won.get(name, 0) + (weight if r.winner_strategy == name else 0)
+    return {name: won[name] / total[name] for name in total}
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Snake-in-the-Box batch tournament")
+    ap.add_argument("--s0", type=str, default="greedy", help="First strategy")
+    ap.add_argument("--s1", type=str, default="greedy", help="Second strategy")
+    ap.add_argument("--games", type=int, default=10, help="Number of games")
+    ap.add_argument("--graph", type=str, default="cube", choices=["erdos", "cube"], help="Graph type")
+    ap.add_argument("--n", type=int, default=30, help="Graph size (Erdos-Renyi)")
+    ap.add_argument("--p", type=float, default=0.08, help="Edge probability (Erdos-Renyi)")
+    ap.add_argument("--d", type=int, default=3, help="Dimension for hypercube")
+    ap.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    ap.add_argument("--no-swap", action="store_true", help="Do not alternate which strategy plays first")
+    ap.add_argument("--distinct-starts", action="store_true",
+                    help="Hypercube only: play each start pair up to symmetry (one per Hamming distance) "
+                         "instead of --games random ones")
+    ap.add_argument("--workers", type=int, default=0, help="Number of worker processes")
+    ap.add_argument("--out", type=str, default=None, help="Write one JSON record per game to this file")
+    return ap.parse_args()
+
+
+def run():
+    args = parse_args()
+    spec = GraphSpec(kind=args.graph, d=args.d, n=args.n, p=args.p)
+    begin = time.perf_counter()
+    if args.distinct_starts:
+        records = run_games(schedule_distinct_starts(args.s0, args.s1, spec, not args.no_swap), args.workers)
+    else:
+        records = run_tournament(args.s0, args.s1, args.games, spec, args.seed, not args.no_swap, args.workers)
+    elapsed = time.perf_counter() - begin
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(asdict(r)) + "\n")
+
+    print(f"{len(records)} games in {elapsed:.2f}s")
+    for name, s in summarize(records).items():
+        print(f"{name}: {s['wins']}/{s['games']} wins ({s['winrate'] * 100:.1f} %), "
+              f"{s['wins_first']}/{s['games_first']} as first player, "
+              f"average move time {s['avg_move_time'] * 1000:.2f} ms")
+    if args.distinct_starts:
+        for name, rate in weighted_winrates(records, args.d).items():
+            print(f"{name}: {rate * 100:.1f} % win rate over all the start pairs (weighted)")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,140 @@
+from typing import List, Optional
+from collections import namedtuple, OrderedDict
+
+from logic import Move
+
+# Transposition table and evaluation cache for the alpha-beta strategies.
+# Positions are identified by their Zobrist key (see logic.GameState.key).
+
+# Bound types of a stored value
+EXACT = 0
+LOWER = 1  # the real value is >= value (beta cutoff)
+UPPER = 2  # the real value is <= value (no move raised alpha)
+
+TTEntry = namedtuple('TTEntry', ['key', 'depth', 'value', 'flag', 'move', 'generation'])
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results, indexed by the low bits of the Zobrist key.
+
+    Replacement policy: a slot is overwritten if it is empty, if its entry comes from an older
+    search (generation), or if the new entry was searched at least as deep as the old one.
+    Deep results of the current search are thus kept.
+    """
+    def __init__(self, size: int = 1 << 18):
+        """
+        :param size: (int) Number of slots, rounded up to a power of two.
+        """
+        bits = max(1, (size - 1).bit_length())
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.entries: List[Optional[TTEntry]] = [None] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """
+        Mark the beginning of a new search: entries of older searches become replaceable.
+
+        :return: (None)
+        """
+        self.generation += 1
+
+    def clear(self):
+        """
+        Remove all entries.
+
+        :return: (None)
+        """
+        self.entries = [None] * self.size
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """
+        Look up a position.
+
+        :param key: (int) Zobrist key of the position.
+        :return: (Optional[TTEntry]) The stored entry, or None if the position is not in the table.
+        """
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, value, flag: int, move: Optional[Move]):
+        """
+        Store a search result, following the replacement policy.
+
+        :param key: (int) Zobrist key of the position.
+        :param depth: (int) Remaining search depth of the result.
+        :param value: (int) Value found by the search.
+        :param flag: (int) EXACT, LOWER or UPPER.
+        :param move: (Optional[Move]) Best move found, used for move ordering.
+        :return: (None)
+        """
+        index = key & self.mask
+        old = self.entries[index]
+        if old is None or old.generation != self.generation or depth >= old.depth:
+            self.entries[index] = TTEntry(key, depth, value, flag, move, self.generation)
+            self.stores += 1
+
+
+class EvaluationCache:
+    """
+    Leaf evaluations by position key, with least recently used eviction. It is kept across
+    searches (and games, as long as the graph does not change): consecutive turns of a game
+    evaluate many of the same leaves.
+    """
+    def __init__(self, size: int = 1 << 16):
+        """
+        :param size: (int) Largest number of stored evaluations.
+        """
+        self.size = size
+        self.entries: 'OrderedDict[int, int]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """
+        Remove all entries (the statistics are kept).
+
+        :return: (None)
+        """
+        self.entries.clear()
+
+    def get(self, key: int) -> Optional[int]:
+        """
+        Look up an evaluation, which becomes the most recently used.
+
+        :param key: (int) Key of the position and of the player it was evaluated for.
+        :return: (Optional[int]) The stored evaluation, or None.
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: int, value: int):
+        """
+        Store an evaluation, evicting the least recently used one if the cache is full.
+
+        :return: (None)
+        """
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
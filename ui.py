@@ -124,7 +124,7 @@ def interactive_view(G_dict, start_a, start_b,
             break
 
         print(f"Player {current}'s turn. Legal moves: {legal}")
-        move = strategies[current].select_move(game.state, game.G, current)
+        move = strategies[current].select_move(game.state.copy(), game.G, current)
 
         if move is None:
             winner = 1 - current
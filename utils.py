@@ -63,6 +63,94 @@ def random_erdos_renyi(n: int, p: float, seed: int = None):
     return G
 
 
+def random_erdos_renyi_fast(n: int, p: float, seed: int = None):
+    """
+    Create a random Erdos-Renyi graph with n nodes and edge probability p in O(n + m) time
+    (Batagelj and Brandes, 2005): instead of drawing a random number for each of the n(n-1)/2
+    pairs, the number of pairs skipped before the next edge is drawn from a geometric distribution.
+    The graphs follow the same distribution as random_erdos_renyi(), but a given seed does not give
+    the same graph as with random_erdos_renyi().
+
+    :param n: (int) Number of nodes.
+    :param p: (float) Probability of edge creation.
+    :param seed: (int) Optional seed for random number generator.
+    :return: (Dict[int, Set[int]]) An Erdos-Renyi graph with n nodes and edge probability p.
+    """
+    rnd = random.Random(seed)
+    G = make_empty_graph(n)
+    if p <= 0:
+        return G
+    if p >= 1:
+        for v in range(n):
+            for w in range(v):
+                add_edge(G, v, w)
+        return G
+    log_q = math.log(1.0 - p)
+    # The pairs (v, w) with w < v are visited in order (1, 0), (2, 0), (2, 1), (3, 0)...
+    v = 1
+    w = -1
+    while v < n:
+        w += 1 + int(math.log(1.0 - rnd.random()) / log_q)
+        while w >= v and v < n:
+            w -= v
+            v += 1
+        if v < n:
+            add_edge(G, v, w)
+    return G
+
+
+def random_erdos_renyi_csr(n: int, p: float, seed: int = None):
+    """
+    NumPy version of random_erdos_renyi_fast(), returning the graph in compressed sparse row
+    form: the neighbours of node v are indices[offsets[v]:offsets[v + 1]], in increasing order.
+    The edges are drawn in vectorized chunks, so that graphs with millions of edges are built
+    without a Python loop. A given seed gives the same graph at each call, but not the same graph
+    as the other generators.
+
+    :param n: (int) Number of nodes.
+    :param p: (float) Probability of edge creation.
+    :param seed: (int) Optional seed for random number generator.
+    :return: (Tuple[np.ndarray, np.ndarray]) The offsets (n + 1 values) and indices (2m values) arrays,
+             see graph.CSRGraph.
+    """
+    # NumPy is only needed by this generator
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+    if p <= 0 or pairs == 0:
+        selected = np.empty(0, dtype=np.int64)
+    elif p >= 1:
+        selected = np.arange(pairs, dtype=np.int64)
+    else:
+        # Positions of the selected pairs among all the pairs, in the order of random_erdos_renyi_fast
+        chunks = []
+        last = -1
+        chunk = int(pairs * p * 1.05) + 64
+        while last < pairs:
+            positions = last + np.cumsum(rng.geometric(p, size=chunk), dtype=np.int64)
+            chunks.append(positions)
+            last = int(positions[-1])
+        selected = np.concatenate(chunks)
+        selected = selected[selected < pairs]
+
+    # Pair number k is (v, w) with v(v-1)/2 <= k < v(v+1)/2 and w = k - v(v-1)/2
+    v = ((1 + np.sqrt(1 + 8 * selected.astype(np.float64))) / 2).astype(np.int64)
+    # Fix the rounding errors of the square root on large graphs
+    v -= v * (v - 1) // 2 > selected
+    v += v * (v + 1) // 2 <= selected
+    w = selected - v * (v - 1) // 2
+
+    dtype = np.int32 if n < 2 ** 31 else np.int64
+    src = np.concatenate([v, w])
+    dst = np.concatenate([w, v])
+    order = np.lexsort((dst, src))
+    indices = dst[order].astype(dtype)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    return offsets, indices
+
+
 def random_regular(n: int, d: int, seed: int = None):
     """
     Create a random regular graph with n nodes and degree d.